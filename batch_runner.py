@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Batch quality assessment across many datasets
+"""
+
+import argparse
+import logging
+import os
+from src.pipeline import load_manifest, run_batch, write_summary
+from src.report import build_reports
+from src.run_history import RunHistory
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every dataset in a manifest")
+    parser.add_argument('manifest', help="JSON list of {name, path, loader, profile, output_dir}")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores)")
+    parser.add_argument('--summary', default='outputs/batch_summary.json',
+                        help="Where to write the combined summary")
+    parser.add_argument('--no-plots', action='store_true', help="Score only, skip charts")
+    parser.add_argument('--history', metavar='DB',
+                        help="SQLite run history: record runs and skip already-scored data")
+    parser.add_argument('--reports', action='store_true',
+                        help="Write a <name>_report.pdf per dataset instead of PNG charts")
+    parser.add_argument('--report-pack', metavar='PATH',
+                        help="Write every dataset into one combined PDF report")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("YSSL Data Quality - Batch Assessment")
+    print("=" * 60)
+    print()
+
+    datasets = load_manifest(args.manifest)
+    print(f"Running {len(datasets)} datasets on {args.workers} workers...")
+    if args.reports or args.report_pack:
+        # Charts are rendered in memory and embedded straight into the PDFs
+        results = build_reports(datasets, workers=args.workers, pack_path=args.report_pack)
+    elif args.history:
+        with RunHistory(args.history) as history:
+            results = run_batch(datasets, workers=args.workers, plots=not args.no_plots,
+                                history=history)
+    else:
+        results = run_batch(datasets, workers=args.workers, plots=not args.no_plots)
+
+    for result in results:
+        if result['status'] == 'ok':
+            overall = result['summary']['quality_scores']['overall']
+            if result.get('skipped'):
+                print(f"  ✓ {result['name']}: {overall:.2f}/5 (unchanged, run #{result['run_id']})")
+            else:
+                print(f"  ✓ {result['name']}: {overall:.2f}/5 ({result['seconds']:.1f}s)")
+            if result.get('report'):
+                print(f"    report: {result['report']}")
+        else:
+            print(f"  ✗ {result['name']}: {result['error']}")
+
+    summary_path = write_summary(results, args.summary)
+    print()
+    print("=" * 60)
+    print(f"Summary saved in: {summary_path}")
+    print("=" * 60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Scaling of column-sharded profiling on a wide table
+
+    python benchmarks/check_column_scaling.py --rows 200000 --columns 300 --workers 1 2 4 8
+
+Times analyze_completeness with QualityAnalyzer(column_stats=True, workers=N)
+for each N against the unsharded QualityAnalyzer(df, column_stats=True), and
+reports each speedup next to the best one the machine allows,
+min(N, os.cpu_count()). Fails if any run's results differ from that baseline
+or if a run is more than --tolerance slower than it.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.quality_analyzer import QualityAnalyzer
+
+
+def wide_frame(rows, columns, seed=0):
+    """Synthetic extract cycling through float, int, code, postal-code and date columns"""
+    rng = np.random.default_rng(seed)
+    postal = np.array([f'K{d}A {e}B{f}' for d, e, f in rng.integers(0, 10, (1000, 3))],
+                      dtype=object)
+    data = {}
+    for i in range(columns):
+        kind = i % 5
+        if kind == 0:
+            values = pd.Series(rng.normal(size=rows))
+        elif kind == 1:
+            values = pd.Series(rng.integers(0, 10_000, rows))
+        elif kind == 2:
+            values = pd.Series(rng.choice(['ON', 'QC', 'BC', 'AB', 'NS'], rows), dtype='str')
+        elif kind == 3:
+            values = pd.Series(postal[rng.integers(0, len(postal), rows)], dtype='str')
+        else:
+            values = pd.Series(pd.to_datetime(rng.integers(1.4e9, 1.75e9, rows), unit='s'))
+        if kind != 1:
+            values[rng.random(rows) < rng.uniform(0, 0.4)] = None
+        data[f'field_{i:03d}'] = values
+    return pd.DataFrame(data)
+
+
+def time_completeness(df, workers, executor, repeat):
+    best, analyzer = None, None
+    for _ in range(repeat):
+        analyzer = QualityAnalyzer(df, workers=workers, executor=executor, column_stats=True)
+        started = time.perf_counter()
+        analyzer.analyze_completeness()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, analyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Column-sharded analysis scaling check")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--columns', type=int, default=300)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="Fail when a run is slower than unsharded by more than this "
+                             "fraction (default 0.1)")
+    parser.add_argument('--repeat', type=int, default=3, help="Keep the best of N runs")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    df = wide_frame(args.rows, args.columns)
+    cores = os.cpu_count() or 1
+    print(f"{args.rows:,} rows x {args.columns} columns on {cores} cores")
+    baseline_seconds, baseline = time_completeness(df, None, args.executor, args.repeat)
+    print(f"  {'unsharded':<24} {baseline_seconds:>8.3f}s")
+
+    failures = []
+    for workers in args.workers:
+        seconds, analyzer = time_completeness(df, workers, args.executor, args.repeat)
+        speedup = baseline_seconds / seconds
+        print(f"  {f'workers={workers} ({args.executor})':<24} {seconds:>8.3f}s "
+              f"({speedup:.2f}x vs unsharded, at most {min(workers, cores)}x here)")
+        for key in ('field_missingness', 'overall_completeness', 'column_stats'):
+            if analyzer.metrics[key] != baseline.metrics[key]:
+                failures.append(f"{workers} workers: {key} differs from the unsharded result")
+        if seconds > baseline_seconds * (1 + args.tolerance):
+            failures.append(f"{workers} workers: {speedup:.2f}x is slower than unsharded")
+
+    for failure in failures:
+        print(f"  ✗ {failure}")
+    if not failures:
+        print("✓ Sharded profiling matches the unsharded run and is no slower")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup-time budget for the scoring-only CLI path
+
+    python benchmarks/check_startup.py --budget 2.0
+
+Runs `main.py --no-plots --json` in fresh interpreters and fails when the
+best wall time exceeds the budget or when a plotting/XML module is imported.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the scoring-only path must never import
+FORBIDDEN = ('matplotlib', 'seaborn', 'lxml', 'xml.etree')
+
+CHECK_IMPORTS = """
+import sys
+sys.argv = ['main.py'] + sys.argv[1:]
+import main
+main.main(sys.argv[1:])
+print('\\n'.join(sorted(sys.modules)), file=sys.stderr)
+"""
+
+
+def time_cli(argv, repeat):
+    """Best wall time of `python main.py argv` over repeat fresh processes"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, 'main.py'] + argv, cwd=ROOT,
+                              capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if proc.returncode != 0:
+            raise SystemExit(f"main.py {' '.join(argv)} failed:\n{proc.stderr}")
+        json.loads(proc.stdout)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def imported_modules(argv):
+    proc = subprocess.run([sys.executable, '-c', CHECK_IMPORTS] + argv, cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"Import check failed:\n{proc.stderr}")
+    return set(proc.stderr.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the no-plot CLI startup budget")
+    parser.add_argument('--budget', type=float, default=2.0,
+                        help="Maximum seconds for a scoring-only run")
+    parser.add_argument('--repeat', type=int, default=3, help="Keep the best of N runs")
+    parser.add_argument('--records', type=int, default=1000)
+    args = parser.parse_args()
+
+    argv = ['cipo', '--no-plots', '--json', '--no-metrics', '--records', str(args.records)]
+    failures = []
+
+    leaked = sorted(name for name in imported_modules(argv)
+                    if name.split('.')[0] in FORBIDDEN or name in FORBIDDEN)
+    if leaked:
+        failures.append(f"scoring-only path imported: {', '.join(leaked[:10])}")
+
+    seconds = time_cli(argv, args.repeat)
+    print(f"main.py {' '.join(argv)}: {seconds:.2f}s (budget {args.budget:.2f}s)")
+    if seconds > args.budget:
+        failures.append(f"took {seconds:.2f}s, over the {args.budget:.2f}s budget")
+
+    for failure in failures:
+        print(f"  ✗ {failure}")
+    if not failures:
+        print("✓ Startup within budget")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
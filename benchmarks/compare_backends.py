@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Per-operation speed of the analyzer backends on the sample datasets
+
+    python benchmarks/compare_backends.py --size 1000000 --backends pandas arrow
+
+Times null counts, duplicate detection, value counts, date parsing and year
+counts with each backend on the CIPO and Ontario fixtures, then a full
+analyze_all(). Fails if any backend's results, scores or metrics differ
+from the pandas reference.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import fixture
+from src.analysis_plan import AnalysisPlan
+from src.data_loader import DataLoader
+from src.chart_aggregates import YEAR_CHARTS
+from src.pipeline import PROFILES
+from src.quality_analyzer import QualityAnalyzer
+
+
+def operations(df, profile):
+    """(label, setup(plan), fn(plan)) for each backend operation the analysis runs"""
+    ops = [('null counts', None, lambda plan: plan.null_counts)]
+    if 'ApplicationNumber' in df.columns:
+        ops.append(('duplicates', None, lambda plan: plan.duplicate_count('ApplicationNumber')))
+    for method, column, _ in PROFILES[profile]:
+        if method not in YEAR_CHARTS and column in df.columns:
+            ops.append((f'value counts {column}', None,
+                        lambda plan, col=column: plan.value_counts(col)))
+    date_columns = AnalysisPlan(df).date_columns
+    if date_columns:
+        col = date_columns[0]
+        ops.append((f'parse dates {col}', None, lambda plan: plan.parse_dates(col)))
+        # The parse is cached on the plan beforehand, so this times the counting alone
+        ops.append((f'year counts {col}', lambda plan: plan.parse_dates(col),
+                    lambda plan: plan.year_counts(col)))
+    return ops
+
+
+def same(left, right):
+    if isinstance(left, pd.Series):
+        try:
+            pd.testing.assert_series_equal(left, right)
+        except AssertionError:
+            return False
+        return True
+    if hasattr(left, 'values'):  # DateParseResult
+        return same(left.values, right.values) and (left.format, left.non_null,
+                    left.fallback_count) == (right.format, right.non_null, right.fallback_count)
+    return left == right
+
+
+def comparable(metrics):
+    """Metrics without the per-rule wall times, which differ on every run"""
+    rules = [{key: value for key, value in rule.items() if key != 'seconds'}
+             for rule in metrics.get('rule_results', [])]
+    return dict(metrics, rule_results=rules)
+
+
+def time_operation(df, backend, setup, fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        plan = AnalysisPlan(df, backend)
+        if setup is not None:
+            setup(plan)
+        started = time.perf_counter()
+        result = fn(plan)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def time_analysis(df, backend, repeat):
+    best, analyzer = None, None
+    for _ in range(repeat):
+        analyzer = QualityAnalyzer(df, backend=backend)
+        started = time.perf_counter()
+        analyzer.analyze_all()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, analyzer
+
+
+def compare(schema, size, backends, repeat, failures):
+    df = DataLoader().load_csv(fixture(schema, size))
+    print(f"{schema}: {len(df):,} rows x {df.shape[1]} columns")
+    print(f"  {'operation':<28}" + ''.join(f"{name:>10}" for name in backends) + "   speedup")
+    for label, setup, fn in operations(df, schema):
+        timings, results = [], []
+        for backend in backends:
+            seconds, result = time_operation(df, backend, setup, fn, repeat)
+            timings.append(seconds)
+            results.append(result)
+            if not same(results[0], result):
+                failures.append(f"{schema} {label}: {backend} differs from {backends[0]}")
+        print(f"  {label:<28}" + ''.join(f"{seconds * 1000:>8.1f}ms" for seconds in timings)
+              + f"   {timings[0] / timings[-1]:.2f}x")
+
+    timings, analyzers = [], []
+    for backend in backends:
+        seconds, analyzer = time_analysis(df, backend, repeat)
+        timings.append(seconds)
+        analyzers.append(analyzer)
+        if analyzer.scores != analyzers[0].scores:
+            failures.append(f"{schema} analyze_all: {backend} scores differ from {backends[0]}")
+        if comparable(analyzer.metrics) != comparable(analyzers[0].metrics):
+            failures.append(f"{schema} analyze_all: {backend} metrics differ from {backends[0]}")
+    print(f"  {'analyze_all':<28}" + ''.join(f"{seconds * 1000:>8.1f}ms" for seconds in timings)
+          + f"   {timings[0] / timings[-1]:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyzer backend comparison")
+    parser.add_argument('--size', type=int, default=1_000_000)
+    parser.add_argument('--schemas', nargs='+', default=['cipo', 'ontario'])
+    parser.add_argument('--backends', nargs='+', default=['pandas', 'arrow'])
+    parser.add_argument('--repeat', type=int, default=3, help="Keep the best of N runs")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print(f"{os.cpu_count()} cores; speedup is {args.backends[-1]} vs {args.backends[0]}")
+    failures = []
+    for schema in args.schemas:
+        compare(schema, args.size, args.backends, args.repeat, failures)
+
+    for failure in failures:
+        print(f"  ✗ {failure}")
+    if not failures:
+        print("✓ Every backend matches the pandas results")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmarks for the load, analyze and visualize stages
+
+    python benchmarks/run_benchmarks.py run --sizes 1000 10000 100000
+    python benchmarks/run_benchmarks.py compare --threshold 0.2
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_loader import DataLoader
+from src.quality_analyzer import QualityAnalyzer
+from src.profiling import StageProfiler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, 'data')
+HISTORY = os.path.join(BENCH_DIR, 'results', 'history.json')
+
+DIMENSIONS = ['analyze_accuracy', 'analyze_completeness', 'analyze_timeliness',
+              'analyze_accessibility', 'analyze_consistency']
+
+# Column-based charts timed per schema; missingness and radar charts are always timed
+PLOTS = {
+    'cipo': [('plot_temporal_distribution', 'FilingDate')],
+    'ontario': [('plot_violations_by_type', 'ViolationType'),
+                ('plot_violations_by_year', 'Year'),
+                ('plot_geographic_distribution', 'City')],
+}
+
+logger = logging.getLogger(__name__)
+
+
+def fixture(schema, size):
+    """Path to a reproducible synthetic CSV, generated on first use"""
+    path = os.path.join(DATA_DIR, f'{schema}_{size}.csv')
+    if not os.path.exists(path):
+        DataLoader().write_sample_data(path, schema=schema, n_records=size,
+                                       chunk_size=min(size, 1_000_000))
+    return path
+
+
+def _best(values):
+    return min(values) if values else None
+
+
+def bench_size(schema, size, repeat=1, plots=True, dpi=72):
+    """Time every stage on one dataset size; returns {stage: {wall_seconds, ...}}
+
+    Times come from repeat untraced passes; Python allocations from one
+    extra pass under tracemalloc, which would otherwise inflate the times.
+    """
+    path = fixture(schema, size)
+    runs = {}
+
+    def record(name, profiler):
+        for stage in profiler.stages:
+            if stage['name'] == stage['stage']:  # top-level call only
+                timing = runs.setdefault(name, {'wall': [], 'cpu': [], 'alloc': [], 'rss': []})
+                if profiler.trace_allocations:
+                    timing['alloc'].append(stage.get('alloc_peak_bytes', 0))
+                    continue
+                timing['wall'].append(stage['wall_seconds'])
+                timing['cpu'].append(stage['cpu_seconds'])
+                timing['rss'].append(stage.get('peak_rss_bytes') or 0)
+
+    def one_pass(trace):
+        loader = DataLoader()
+        with StageProfiler(f'bench-{schema}-{size}', trace_allocations=trace) as profiler:
+            df = loader.load_csv(path)
+        record('load_csv', profiler)
+
+        for dimension in DIMENSIONS:
+            # Fresh analyzer per dimension so no cached intermediates carry over
+            analyzer = QualityAnalyzer(df)
+            with StageProfiler(trace_allocations=trace) as profiler:
+                getattr(analyzer, dimension)()
+            record(dimension, profiler)
+
+        analyzer = QualityAnalyzer(df)
+        with StageProfiler(trace_allocations=trace) as profiler:
+            scores = analyzer.analyze_all()
+        record('analyze_all', profiler)
+
+        if plots:
+            from src.visualizer import QualityVisualizer
+            with tempfile.TemporaryDirectory() as out:
+                viz = QualityVisualizer(output_dir=out, dpi=dpi, headless=True)
+                jobs = [(method, lambda m=method, c=column: getattr(viz, m)(df, c, plan=analyzer.plan))
+                        for method, column in PLOTS[schema] if column in df.columns]
+                if 'field_missingness' in analyzer.metrics:
+                    jobs.append(('plot_missingness',
+                                 lambda: viz.plot_missingness(analyzer.metrics['field_missingness'])))
+                jobs.append(('plot_quality_radar', lambda: viz.plot_quality_radar(scores)))
+                for name, job in jobs:
+                    with StageProfiler(trace_allocations=trace) as profiler:
+                        job()
+                    record(name, profiler)
+
+    for _ in range(repeat):
+        one_pass(trace=False)
+    one_pass(trace=True)
+
+    return {
+        name: {
+            'wall_seconds': _best(timing['wall']),
+            'cpu_seconds': _best(timing['cpu']),
+            'alloc_peak_bytes': max(timing['alloc']),
+            'peak_rss_bytes': max(timing['rss']),
+            'rows_per_second': size / _best(timing['wall']) if _best(timing['wall']) else None,
+        }
+        for name, timing in runs.items()
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=BENCH_DIR, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def run(args):
+    results = {}
+    for schema in args.schemas:
+        for size in args.sizes:
+            print(f"Benchmarking {schema} at {size:,} rows...")
+            results.setdefault(schema, {})[str(size)] = bench_size(
+                schema, size, repeat=args.repeat, plots=not args.no_plots, dpi=args.dpi
+            )
+            for stage, timing in results[schema][str(size)].items():
+                print(f"  {stage:<32} {timing['wall_seconds']:>9.4f}s "
+                      f"{timing['alloc_peak_bytes'] / 1e6:>9.1f} MB")
+
+    entry = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'label': args.label,
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+    history = load_history(args.history)
+    history.append(entry)
+    os.makedirs(os.path.dirname(args.history), exist_ok=True)
+    with open(args.history, 'w') as f:
+        json.dump(history, f, indent=2)
+    print(f"✓ Appended run {len(history) - 1} to {args.history}")
+
+
+def _pick(history, ref):
+    """The latest run labelled or committed as ref, else the run at index ref"""
+    if ref is None:
+        return None
+    # A short commit hash can be all digits, so names win over indices
+    matches = [entry for entry in history if ref in (entry.get('label'), entry.get('commit'))]
+    if matches:
+        return matches[-1]
+    try:
+        return history[int(ref)]
+    except (ValueError, IndexError):
+        raise SystemExit(f"No benchmark run matches '{ref}'")
+
+
+def compare_runs(baseline, current, threshold=0.2, min_seconds=0.005):
+    """List stages whose time or peak allocations grew by more than threshold"""
+    regressions = []
+    for schema, sizes in current['results'].items():
+        for size, stages in sizes.items():
+            base_stages = baseline['results'].get(schema, {}).get(size, {})
+            for stage, timing in stages.items():
+                base = base_stages.get(stage)
+                if base is None:
+                    continue
+                for field, floor in (('wall_seconds', min_seconds), ('alloc_peak_bytes', 1 << 20)):
+                    old, new = base.get(field) or 0, timing.get(field) or 0
+                    # Ignore noise on stages too small to time or measure reliably
+                    if max(old, new) < floor or old == 0:
+                        continue
+                    change = (new - old) / old
+                    if change > threshold:
+                        regressions.append((schema, size, stage, field, old, new, change))
+    return regressions
+
+
+def compare(args):
+    history = load_history(args.history)
+    if len(history) < 2 and args.baseline is None:
+        raise SystemExit("Need at least two benchmark runs to compare")
+    baseline = _pick(history, args.baseline) or history[-2]
+    current = _pick(history, args.current) or history[-1]
+    print(f"Baseline: {baseline.get('label') or baseline['timestamp']} ({baseline.get('commit')})")
+    print(f"Current:  {current.get('label') or current['timestamp']} ({current.get('commit')})")
+
+    regressions = compare_runs(baseline, current, args.threshold)
+    if not regressions:
+        print(f"✓ No regressions beyond {args.threshold:.0%}")
+        return 0
+    for schema, size, stage, field, old, new, change in regressions:
+        print(f"  ✗ {schema} {int(size):>10,} {stage:<32} {field:<16} "
+              f"{old:.4g} -> {new:.4g} (+{change:.0%})")
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YSSL data quality scaling benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="Benchmark and append results to the history")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[10 ** 3, 10 ** 4, 10 ** 5])
+    run_parser.add_argument('--schemas', nargs='+', choices=['cipo', 'ontario'],
+                            default=['cipo', 'ontario'])
+    run_parser.add_argument('--repeat', type=int, default=3, help="Keep the best of N runs")
+    run_parser.add_argument('--no-plots', action='store_true')
+    run_parser.add_argument('--dpi', type=int, default=72)
+    run_parser.add_argument('--label', help="Name for this run, e.g. a branch")
+    run_parser.add_argument('--history', default=HISTORY)
+
+    compare_parser = sub.add_parser('compare', help="Flag regressions between two runs")
+    compare_parser.add_argument('--baseline', help="Run index, label or commit (default: previous)")
+    compare_parser.add_argument('--current', help="Run index, label or commit (default: latest)")
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help="Allowed relative slowdown, e.g. 0.2 for 20%%")
+    compare_parser.add_argument('--history', default=HISTORY)
+
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    if args.command == 'run':
+        run(args)
+        return 0
+    return compare(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Query the run history recorded by `batch_runner.py --history` or `main.py --history`
+
+    python history.py trend ontario --dimension completeness --last 12
+    python history.py regressions ontario --threshold 0.2
+    python history.py drift ontario --last 5 --threshold 5
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from src.run_history import RunHistory
+
+def _when(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')
+
+def main():
+    parser = argparse.ArgumentParser(description="Trend, regression and drift queries over past runs")
+    parser.add_argument('--db', default='outputs/run_history.sqlite', help="Run history database")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    trend = sub.add_parser('trend', help="One score dimension (or field's missing %%) over time")
+    trend.add_argument('dataset')
+    trend.add_argument('--dimension', default='overall')
+    trend.add_argument('--field', help="Show a field's missing %% instead of a score")
+    trend.add_argument('--last', type=int, default=10)
+
+    regressions = sub.add_parser('regressions', help="Score drops since the previous run")
+    regressions.add_argument('dataset')
+    regressions.add_argument('--threshold', type=float, default=0.2)
+
+    drift = sub.add_parser('drift', help="Fields losing completeness and year-mix shift")
+    drift.add_argument('dataset')
+    drift.add_argument('--last', type=int, default=5)
+    drift.add_argument('--threshold', type=float, default=5.0,
+                       help="Minimum rise in missing %% points")
+    args = parser.parse_args()
+
+    with RunHistory(args.db) as history:
+        if args.command == 'trend':
+            if args.field:
+                rows = history.field_trend(args.dataset, args.field, args.last)
+                label, unit = f"{args.field} missing", '%'
+            else:
+                rows = history.trend(args.dataset, args.dimension, args.last)
+                label, unit = args.dimension, '/5'
+            print(f"{args.dataset} {label} over {len(rows)} runs:")
+            for run_id, created_at, value in rows:
+                print(f"  #{run_id:<5} {_when(created_at)}  {value:.2f}{unit}")
+            return 0 if rows else 1
+
+        if args.command == 'regressions':
+            rows = history.regressions(args.dataset, args.threshold)
+            for row in rows:
+                print(f"  ✗ {row['dimension']}: {row['previous']:.2f} -> {row['current']:.2f} "
+                      f"({row['change']:+.2f})")
+            if not rows:
+                print(f"✓ No score fell by more than {args.threshold} since the previous run")
+            return 1 if rows else 0
+
+        rows = history.completeness_drift(args.dataset, args.last, args.threshold)
+        for row in rows:
+            print(f"  ✗ {row['field']}: {row['first']:.1f}% -> {row['latest']:.1f}% missing "
+                  f"({row['change']:+.1f} points, worst {row['worst']:.1f}%)")
+        if not rows:
+            print(f"✓ No field lost more than {args.threshold} points of completeness "
+                  f"over the last {args.last} runs")
+        year_drift = history.year_drift(args.dataset)
+        if year_drift is not None:
+            print(f"Year distribution shift since the previous run: {year_drift:.1%}")
+        return 1 if rows else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
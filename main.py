@@ -2,43 +2,88 @@
 """
 YSSL Data Quality Assessment Tool
 Main execution script
+
+    python main.py                                  # CIPO sample data, scores and charts
+    python main.py ontario                          # Ontario employment standards
+    python main.py cipo --input feed.csv --no-plots --json
+
+Heavy modules (pandas, matplotlib/seaborn, lxml) are imported only by the
+stages that need them, so scoring-only runs start quickly.
 """
 
-import sys
+import argparse
+import contextlib
+import json
 import logging
-from src.data_loader import DataLoader
-from src.quality_analyzer import QualityAnalyzer
-from src.visualizer import QualityVisualizer
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+import os
+import sys
+
 logger = logging.getLogger(__name__)
 
-def main():
-    """Main execution function"""
-    print("=" * 60)
-    print("YSSL Data Quality Assessment Tool")
-    print("=" * 60)
-    print()
+TITLES = {
+    'cipo': "YSSL Data Quality Assessment Tool",
+    'ontario': "Ontario Employment Standards - Quality Analysis",
+}
+OUTPUT_DIRS = {'cipo': 'outputs', 'ontario': 'outputs/ontario'}
+
+
+def load_data(dataset, input_path=None, n_records=1000):
+    """Load the dataset for a flow: a file when given, sample data otherwise"""
+    from src.data_loader import DataLoader
     
-    # Step 1: Load Data
-    print("Step 1: Loading dataset...")
     loader = DataLoader()
+    if dataset == 'ontario':
+        return loader.load_ontario_employment(input_path or 'data/ontario_employment.csv')
+    if input_path is None:
+        # Create sample data (replace with real data loading if available)
+        return loader.create_sample_data(n_records=n_records)
+    if input_path.lower().endswith('.xml'):
+        import pandas as pd
+        batches = list(loader.load_cipo_xml(input_path))
+        return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+    return loader.load_csv(input_path)
+
+
+def plot_cipo(aggregates, output_dir):
+    """Draw the CIPO charts in this process"""
+    from src.visualizer import QualityVisualizer
     
-    # Create sample data (replace with real data loading if available)
-    df = loader.create_sample_data(n_records=1000)
+    viz = QualityVisualizer(output_dir=output_dir)
+    charts = []
+    try:
+        if 'FilingDate' in aggregates:
+            charts.append(viz.plot_temporal_distribution(aggregates, 'FilingDate',
+                                                         "Trademark Applications by Year"))
+        charts.append(viz.plot_missingness(aggregates.field_missingness,
+                                           "Missing Value Rate by Field"))
+        charts.append(viz.plot_quality_radar(aggregates.scores, "Data Quality Assessment"))
+    except Exception as e:
+        logger.error(f"Error generating visualizations: {e}")
+    return charts
+
+
+def plot_ontario(aggregates, output_dir):
+    """Draw the Ontario charts in parallel worker processes"""
+    from src.visualizer import QualityVisualizer
     
-    print(f"✓ Loaded {len(df)} records with {len(df.columns)} fields")
-    print()
+    viz = QualityVisualizer(output_dir=output_dir, headless=True)
+    jobs = []
     
-    # Step 2: Analyze Quality
-    print("Step 2: Analyzing data quality...")
-    analyzer = QualityAnalyzer(df)
-    scores = analyzer.analyze_all()
+    # Workers receive the small aggregates rather than slices of the frame
+    for method, column in (('plot_violations_by_type', 'ViolationType'),
+                           ('plot_violations_by_year', 'Year'),
+                           ('plot_geographic_distribution', 'City')):
+        if column in aggregates:
+            jobs.append((method, (aggregates, column)))
     
+    jobs.append(('plot_quality_radar', (aggregates.scores, "Ontario Data Quality")))
+    return [path for path in viz.render_all(jobs) if path is not None]
+
+
+PLOTTERS = {'cipo': plot_cipo, 'ontario': plot_ontario}
+
+
+def print_scores(scores):
     print("\nQuality Scores:")
     print(f"  • Overall:       {scores['overall']:.2f}/5")
     print(f"  • Accuracy:      {scores['accuracy']:.2f}/5")
@@ -47,25 +92,194 @@ def main():
     print(f"  • Accessibility: {scores['accessibility']:.2f}/5")
     print(f"  • Consistency:   {scores['consistency']:.2f}/5")
     print()
+
+
+def run_analysis(args):
+    """Load, analyze and (optionally) visualize one dataset; returns a JSON-ready result"""
+    print("=" * 60)
+    print(TITLES[args.dataset])
+    print("=" * 60)
+    print()
+    
+    # Step 1: Load Data
+    print("Step 1: Loading dataset...")
+    df = load_data(args.dataset, args.input, args.records)
+    if df.empty:
+        print("No data loaded")
+        return {'dataset': args.dataset, 'status': 'error', 'error': "No data loaded"}
+    
+    print(f"✓ Loaded {len(df)} records with {len(df.columns)} fields")
+    print()
+    
+    # Step 2: Analyze Quality
+    print("Step 2: Analyzing data quality...")
+    from src.pipeline import RESULT_METRICS
+    from src.quality_analyzer import QualityAnalyzer
+    
+    analyzer = QualityAnalyzer(df, workers=args.column_workers, backend=args.backend,
+                               column_stats=args.column_stats)
+    scores = analyzer.analyze_all()
+    print_scores(scores)
+    
+    result = {
+        'dataset': args.dataset,
+        'input': args.input,
+        'status': 'ok',
+        'summary': analyzer.get_summary_report(),
+        'metrics': {key: analyzer.metrics[key] for key in RESULT_METRICS + ('accuracy_issues',)
+                    if key in analyzer.metrics},
+        'charts': [],
+    }
     
     # Step 3: Generate Visualizations
-    print("Step 3: Generating visualizations...")
-    viz = QualityVisualizer(output_dir='outputs')
+    if not args.no_plots or args.history:
+        from src.chart_aggregates import ChartAggregates
+        
+        # Charts are drawn from compact counts, so the rows can be released first
+        aggregates = ChartAggregates.from_analyzer(analyzer, args.dataset, args.dataset)
+        del df, analyzer
+        if args.history:
+            # Kept in the run history so a skipped rerun can still draw its charts
+            result['chart_data'] = aggregates.to_dict()
+        if not args.no_plots:
+            print("Step 3: Generating visualizations...")
+            plot(result, aggregates, args)
+            print()
     
-    try:
-        viz.plot_temporal_distribution(df, 'FilingDate', 
-                                      "Trademark Applications by Year")
-        viz.plot_missingness(analyzer.metrics['field_missingness'],
-                           "Missing Value Rate by Field")
-        viz.plot_quality_radar(scores, "Data Quality Assessment")
-    except Exception as e:
-        logger.error(f"Error generating visualizations: {e}")
+    return result
+
+
+def plot(result, aggregates, args):
+    """Save the chart aggregates and draw the flow's charts into result"""
+    result['aggregates'] = aggregates.save(f'{args.output_dir}/chart_aggregates.json')
+    result['charts'] = PLOTTERS[args.dataset](aggregates, args.output_dir)
+
+
+def dataset_spec(args):
+    """Manifest-style spec of the data a CLI run reads, for fingerprinting"""
+    if args.dataset == 'ontario':
+        path = args.input or 'data/ontario_employment.csv'
+        if os.path.exists(path):
+            return {'loader': 'ontario', 'path': path}
+        # load_ontario_employment falls back to 1000 sample records
+        return {'loader': 'sample_ontario', 'n_records': 1000}
+    if args.input is None:
+        return {'loader': 'sample', 'n_records': args.records}
+    return {'loader': 'cipo_xml' if args.input.lower().endswith('.xml') else 'csv',
+            'path': args.input}
+
+
+def run_with_history(args):
+    """run_analysis, skipped when the run history already holds scores for this data
+
+    A skipped run still draws its charts, from the stored chart data, when
+    plots are wanted and the stored charts are not in --output-dir.
+    """
+    from src.pipeline import has_charts
+    from src.run_history import RunHistory, spec_fingerprint
     
-    print()
-    print("=" * 60)
-    print("Analysis Complete!")
-    print(f"Results saved in: ./outputs/")
-    print("=" * 60)
+    name = os.path.splitext(os.path.basename(args.input))[0] if args.input else args.dataset
+    with RunHistory(args.history) as history:
+        fingerprint = spec_fingerprint(dataset_spec(args))
+        stored = history.lookup(fingerprint, args.dataset)
+        replot = stored is not None and not args.no_plots and \
+            not has_charts(stored, args.output_dir)
+        if replot and 'chart_data' not in stored:
+            # Recorded before chart data was kept: charts can only come from a rerun
+            stored = None
+        if stored is not None:
+            print(f"✓ Data unchanged since run #{stored['run_id']}; skipping recomputation")
+            print_scores(stored['summary']['quality_scores'])
+            chart_data = stored.pop('chart_data', None)
+            result = dict(stored, dataset=args.dataset, input=args.input, status='ok',
+                          skipped=True)
+            if replot:
+                from src.chart_aggregates import ChartAggregates
+                
+                print("Generating visualizations from the stored chart data...")
+                plot(result, ChartAggregates.from_dict(chart_data), args)
+                print()
+            return result
+        
+        result = run_analysis(args)
+        if result['status'] == 'ok':
+            result['run_id'] = history.record(name, args.dataset, fingerprint, result)
+        result.pop('chart_data', None)
+        return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Assess the quality of a regulatory dataset")
+    parser.add_argument('dataset', nargs='?', choices=sorted(TITLES), default='cipo',
+                        help="Which flow to run (default: cipo)")
+    parser.add_argument('--input', help="Dataset file (CSV, or XML for cipo); "
+                                        "defaults to sample data / data/ontario_employment.csv")
+    parser.add_argument('--records', type=int, default=1000,
+                        help="Sample records to generate when no input is given")
+    parser.add_argument('--output-dir', help="Chart and metrics directory "
+                                             "(default: outputs or outputs/ontario)")
+    parser.add_argument('--no-plots', action='store_true',
+                        help="Score only; matplotlib is never imported")
+    parser.add_argument('--json', action='store_true',
+                        help="Print the result as JSON on stdout (progress goes to stderr)")
+    parser.add_argument('--column-workers', type=int, metavar='N',
+                        help="Profile columns on N threads; only used with --column-stats "
+                             "and only pays off on multi-core machines")
+    parser.add_argument('--column-stats', action='store_true',
+                        help="Profile every column (cardinality, lengths, value "
+                             "patterns) into metrics.column_stats")
+    parser.add_argument('--backend', choices=['pandas', 'arrow'], default='pandas',
+                        help="Count nulls and duplicates and parse dates with pandas or on "
+                             "the Arrow buffers (same results; arrow only speeds up "
+                             "Arrow-backed text, the default from pandas 3)")
+    parser.add_argument('--history', metavar='DB',
+                        help="SQLite run history: record this run, or skip it if the "
+                             "same data was already scored")
+    parser.add_argument('--no-metrics', action='store_true',
+                        help="Skip the run_metrics.json / run_metrics.prom stage profile")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Add Python allocation sizes to the stage profile "
+                             "(tracemalloc; several times slower)")
+    args = parser.parse_args(argv)
+    args.output_dir = args.output_dir or OUTPUT_DIRS[args.dataset]
+    return args
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.json else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    # In JSON mode stdout carries only the result document
+    progress = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    analyze = run_with_history if args.history else run_analysis
+    with progress:
+        if args.no_metrics:
+            result = analyze(args)
+        else:
+            from src.profiling import StageProfiler
+            with StageProfiler(args.dataset, trace_allocations=args.trace_memory) as profiler:
+                result = analyze(args)
+            profiler.write_json(f'{args.output_dir}/run_metrics.json')
+            profiler.write_prometheus(f'{args.output_dir}/run_metrics.prom')
+    
+        print("=" * 60)
+        print("Analysis Complete!")
+        if result.get('aggregates') or not args.no_metrics:
+            output_dir = args.output_dir if os.path.isabs(args.output_dir) else \
+                os.path.join('.', args.output_dir)
+            print(f"Results saved in: {os.path.join(output_dir, '')}")
+        print("=" * 60)
+    
+    if args.json:
+        from src.pipeline import _to_builtin
+        
+        json.dump(result, sys.stdout, indent=2, default=_to_builtin)
+        sys.stdout.write('\n')
+    return 0 if result['status'] == 'ok' else 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
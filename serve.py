@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Local scoring service with warm workers and a fingerprint-keyed result cache
+"""
+
+import argparse
+import logging
+from src.service import ScoringService, make_server
+
+logging.basicConfig(level=logging.INFO)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve quality assessments over local HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=2, help="Warm worker processes")
+    parser.add_argument('--cache-size', type=int, default=128,
+                        help="Results kept in the LRU cache")
+    parser.add_argument('--output-dir', default='outputs/service',
+                        help="Parent directory for chart output")
+    parser.add_argument('--no-plots', action='store_true', help="Score only, skip charts by default")
+    args = parser.parse_args()
+
+    service = ScoringService(workers=args.workers, cache_size=args.cache_size,
+                             plots=not args.no_plots, output_dir=args.output_dir).start()
+    server = make_server(service, args.host, args.port)
+    print(f"Scoring service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from src.backends import get_backend
+from src.date_parsing import detect_date_columns
+
+
+class AnalysisPlan:
+    """Shared, lazily computed intermediates for one DataFrame
+
+    The analyzer dimensions, the summary report and the visualizer read the
+    null counts, parsed date columns, value counts and duplicate counts from
+    here, so each is computed at most once per run. The counts and date
+    parsing themselves run on a backend ('pandas' or 'arrow', see
+    src/backends.py); every backend gives identical results.
+    """
+
+    def __init__(self, df, backend='pandas'):
+        self.df = df
+        self.backend = get_backend(backend, df)
+        self._row_non_null_counts = None
+        self._null_counts = None
+        self._date_columns = None
+        self._dates = {}
+        self._year_counts = {}
+        self._value_counts = {}
+        self._duplicate_counts = {}
+
+    @property
+    def row_non_null_counts(self):
+        """Non-missing values per row (the n x m mask itself is not kept)"""
+        if self._row_non_null_counts is None:
+            self._row_non_null_counts = self.df.notna().sum(axis=1)
+        return self._row_non_null_counts
+
+    @property
+    def null_counts(self):
+        """Missing values per column"""
+        if self._null_counts is None:
+            self._null_counts = self.backend.null_counts()
+        return self._null_counts
+
+    def set_null_counts(self, counts):
+        """Use null counts computed elsewhere (e.g. by column shards) instead of the mask"""
+        self._null_counts = counts
+
+    @property
+    def missing_cells(self):
+        return self.null_counts.sum()
+
+    @property
+    def date_columns(self):
+        """Columns holding dates, by name or by content"""
+        if self._date_columns is None:
+            self._date_columns = detect_date_columns(self.df)
+        return self._date_columns
+
+    def parse_dates(self, column):
+        """DateParseResult for a column, parsed with its inferred format"""
+        if column not in self._dates:
+            self._dates[column] = self.backend.parse_dates(column)
+        return self._dates[column]
+
+    def year_counts(self, column):
+        """Records per year of a date column, sorted by year"""
+        if column not in self._year_counts:
+            self._year_counts[column] = self.backend.year_counts(self.parse_dates(column))
+        return self._year_counts[column]
+
+    def value_counts(self, column):
+        """Value counts of a column, most frequent first"""
+        if column not in self._value_counts:
+            self._value_counts[column] = self.backend.value_counts(column)
+        return self._value_counts[column]
+
+    def duplicate_count(self, column):
+        """Number of values in a column that repeat an earlier one"""
+        if column not in self._duplicate_counts:
+            self._duplicate_counts[column] = self.backend.duplicate_count(column)
+        return self._duplicate_counts[column]
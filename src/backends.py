@@ -0,0 +1,247 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.date_parsing import parse_dates
+
+ISO_DATE = '%Y-%m-%d'
+# Byte offsets of the digits in 'YYYY-MM-DD'
+ISO_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9]
+US_PER_DAY = 86_400_000_000
+DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+# Widest date range (about 270 years) counted by day before converting to years
+MAX_DAY_SPAN = 100_000
+
+
+class PandasBackend:
+    """Reference implementation of the column operations the analyzer runs
+
+    Every other backend must return exactly what this one returns: the same
+    counts, dtypes, index order and names.
+    """
+
+    name = 'pandas'
+
+    def __init__(self, df):
+        self.df = df
+
+    def null_counts(self):
+        """Missing values per column, like df.isna().sum()"""
+        return self.df.isna().sum()
+
+    def duplicate_count(self, column):
+        """Values of a column that repeat an earlier value (missing values included)"""
+        return int(self.df[column].duplicated().sum())
+
+    def value_counts(self, column):
+        """Value counts of a column, most frequent first, without zero counts"""
+        counts = self.df[column].value_counts()
+        # Categoricals report unused categories with a zero count
+        return counts[counts > 0]
+
+    def parse_dates(self, column):
+        """DateParseResult for a column, parsed with its inferred format"""
+        return parse_dates(self.df[column])
+
+    def year_counts(self, parsed):
+        """Records per year of a DateParseResult, sorted by year"""
+        return parsed.dropna().dt.year.value_counts().sort_index()
+
+
+def _arrow_strings(series):
+    """The column as one Arrow string array when it is Arrow-backed text, else None"""
+    if getattr(series.dtype, 'storage', None) != 'pyarrow' and not isinstance(series.dtype,
+                                                                             pd.ArrowDtype):
+        return None
+    arr = pa.array(series.array)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return None
+    return arr
+
+
+def _offsets(arr):
+    width = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    return np.frombuffer(arr.buffers()[1], dtype=width)[arr.offset:arr.offset + len(arr) + 1]
+
+
+def _fixed_width_keys(arr):
+    """Sortable keys that are equal exactly where the strings are equal, or None
+
+    Only null-free arrays whose values share one byte length qualify. Byte
+    positions that never vary (an application number's 'CA' prefix) are
+    dropped, so most codes fit one uint64 instead of a byte string.
+    """
+    if arr.null_count or not len(arr):
+        return None
+    offsets = _offsets(arr)
+    width = int(offsets[1] - offsets[0])
+    if not width or offsets[-1] - offsets[0] != width * len(arr) or \
+            np.any(np.diff(offsets) != width):
+        return None
+    data = np.frombuffer(arr.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+    chars = data.reshape(-1, width)
+    varying = chars[:, ~(chars == chars[0]).all(axis=0)]
+    if varying.shape[1] > 8:
+        return np.ascontiguousarray(varying).view(np.dtype((np.void, varying.shape[1]))).ravel()
+    packed = np.zeros((len(arr), 8), dtype=np.uint8)
+    packed[:, :varying.shape[1]] = varying
+    return packed.view(np.uint64).ravel()
+
+
+def _days_from_civil(year, month, day):
+    """Days since 1970-01-01 of proleptic Gregorian dates (H. Hinnant's algorithm)"""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+# Days since 1970-01-01 of January 1st of years 0-9999, and days before each month
+YEAR_START = _days_from_civil(np.arange(10_000), 1, 1)
+MONTH_START = np.concatenate([[0, 0], np.cumsum(DAYS_IN_MONTH[1:12])])
+
+
+def _iso_dates(arr, offsets, rows):
+    """Parse strictly formatted 'YYYY-MM-DD' values at the given rows
+
+    Returns (datetime64[us] values, ok mask); rows that are not a valid
+    calendar date in exactly that shape are left to pandas.
+    """
+    data = np.frombuffer(arr.buffers()[2], dtype=np.uint8)
+    starts = offsets[rows]
+    if len(rows) and starts[-1] - starts[0] == 10 * (len(rows) - 1):
+        # Back-to-back values (nulls take no bytes) are a zero-copy (rows, 10) view
+        chars = data[starts[0]:starts[0] + 10 * len(rows)].reshape(-1, 10)
+        char = lambda i: chars[:, i]
+    else:
+        char = lambda i: data[starts + i]
+    ok = (char(4) == ord('-')) & (char(7) == ord('-'))
+    digits = [char(i) - np.uint8(ord('0')) for i in ISO_DIGITS]
+    for digit in digits:
+        # Bytes below '0' wrap around, so one comparison rejects every non-digit
+        ok &= digit <= 9
+    digits = [digit.astype(np.int32) for digit in digits]
+    year = digits[0] * 1000 + digits[1] * 100 + digits[2] * 10 + digits[3]
+    month = digits[4] * 10 + digits[5]
+    day = digits[6] * 10 + digits[7]
+    ok &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    ok &= day <= DAYS_IN_MONTH[np.where(ok, month, 0)] + (leap & (month == 2))
+
+    month = np.where(ok, month, 1)
+    days = YEAR_START[np.where(ok, year, 1970)] + MONTH_START[month] + (leap & (month > 2)) + day - 1
+    days = np.where(ok, days, 0).astype(np.int64)
+    return (days * US_PER_DAY).view('datetime64[us]'), ok
+
+
+class ArrowBackend(PandasBackend):
+    """Backend that reads Arrow-backed columns through their Arrow buffers
+
+    Null counts come from each array's validity bitmap, duplicates from
+    Arrow's hash kernel (or a byte sort for fixed-width keys such as
+    application numbers), 'YYYY-MM-DD' dates from a vectorised byte parser
+    run over row blocks on a thread pool, and year counts from a bincount.
+    Text is Arrow-backed by default from pandas 3 ('str'); older pandas needs
+    'string[pyarrow]' or ArrowDtype columns. Columns that are not
+    Arrow-backed, and date values outside the strict ISO shape, are handled
+    exactly as PandasBackend handles them.
+    """
+
+    name = 'arrow'
+
+    def __init__(self, df, threads=None, block_rows=250_000):
+        super().__init__(df)
+        self.threads = threads or os.cpu_count() or 1
+        self.block_rows = block_rows
+
+    def null_counts(self):
+        counts = []
+        for col in range(self.df.shape[1]):
+            series = self.df.iloc[:, col]
+            arr = _arrow_strings(series)
+            counts.append(arr.null_count if arr is not None else int(series.isna().sum()))
+        return pd.Series(counts, index=self.df.columns, dtype='int64')
+
+    def duplicate_count(self, column):
+        arr = _arrow_strings(self.df[column])
+        if arr is None:
+            return super().duplicate_count(column)
+        keys = _fixed_width_keys(arr)
+        if keys is not None:
+            keys = np.sort(keys)
+            return int((keys[1:] == keys[:-1]).sum())
+        # unique() keeps one null, just as duplicated() flags all but the first
+        return len(arr) - len(pc.unique(arr))
+
+    def _first_pass(self, series, date_format):
+        arr = _arrow_strings(series)
+        if date_format != ISO_DATE or arr is None:
+            return pd.to_datetime(series, format=date_format, errors='coerce')
+
+        offsets = _offsets(arr).astype(np.int64)
+        valid = np.diff(offsets) == 10
+        if arr.null_count:
+            valid &= arr.is_valid().to_numpy(zero_copy_only=False)
+        rows = np.flatnonzero(valid)
+        blocks = [rows[i:i + self.block_rows] for i in range(0, len(rows), self.block_rows)]
+        if len(blocks) > 1 and self.threads > 1:
+            with ThreadPoolExecutor(max_workers=self.threads) as pool:
+                parts = list(pool.map(lambda block: _iso_dates(arr, offsets, block), blocks))
+        else:
+            parts = [_iso_dates(arr, offsets, block) for block in blocks]
+        if not parts or not any(ok.any() for _, ok in parts):
+            return pd.to_datetime(series, format=date_format, errors='coerce')
+
+        values = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[us]')
+        parsed = np.zeros(len(series), dtype=bool)
+        for block, (block_values, ok) in zip(blocks, parts):
+            values[block[ok]] = block_values[ok]
+            parsed[block[ok]] = True
+        # Everything else takes pandas' own path, so leniency and errors match exactly
+        rest = np.flatnonzero(~parsed & series.notna().to_numpy())
+        if len(rest):
+            values[rest] = pd.to_datetime(series.iloc[rest], format=date_format,
+                                          errors='coerce').to_numpy().astype('datetime64[us]')
+        return pd.Series(values, index=series.index, name=series.name)
+
+    def parse_dates(self, column):
+        return parse_dates(self.df[column], first_pass=self._first_pass)
+
+    def year_counts(self, parsed):
+        values = parsed.values
+        if not pd.api.types.is_datetime64_dtype(values.dtype):
+            return super().year_counts(parsed)
+        stamps = values.to_numpy()
+        stamps = stamps[~np.isnat(stamps)]
+        unit, _ = np.datetime_data(stamps.dtype)
+        days = stamps.view(np.int64) // np.timedelta64(1, 'D').astype(f'm8[{unit}]').astype(np.int64)
+        if not len(days) or days.max() - days.min() > MAX_DAY_SPAN:
+            return super().year_counts(parsed)
+        # Count per day, then convert only the distinct days to years
+        first = days.min()
+        per_day = np.bincount(days - first)
+        day_years = (np.arange(first, first + len(per_day)).astype('datetime64[D]')
+                     .astype('datetime64[Y]').astype(np.int64) + 1970)
+        counts = np.bincount(day_years - day_years[0], weights=per_day).astype(np.int64)
+        present = np.flatnonzero(counts)
+        index = pd.Index((present + day_years[0]).astype(np.int32), name=values.name)
+        return pd.Series(counts[present], index=index, name='count')
+
+BACKENDS = {backend.name: backend for backend in (PandasBackend, ArrowBackend)}
+
+
+def get_backend(backend, df):
+    """A backend instance for df from a name ('pandas', 'arrow') or an instance"""
+    if isinstance(backend, PandasBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'; use one of {', '.join(BACKENDS)}")
+    return BACKENDS[backend](df)
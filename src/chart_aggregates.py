@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+from collections import Counter
+
+import pandas as pd
+
+from src.date_parsing import infer_date_format, parse_dates
+
+logger = logging.getLogger(__name__)
+
+# Profile charts that plot a date column by year; the others plot value counts
+YEAR_CHARTS = {'plot_temporal_distribution'}
+# Charts that only show the most frequent values keep this many when saved
+TOP_N_CHARTS = {'plot_geographic_distribution': 25}
+
+
+class ChartAggregates:
+    """Compact statistics the charts are drawn from, in place of the raw rows
+
+    Holds per-year record counts for date columns, value counts for category
+    columns (top-N for city-style columns), per-field missingness and the
+    quality scores. It answers year_counts() and value_counts() like
+    AnalysisPlan, so every QualityVisualizer plot accepts it where it takes
+    a DataFrame. Build it from a finished analyzer, or fold chunks in with
+    update() during a streaming pass; save()/load() round-trip it as JSON.
+    """
+
+    def __init__(self, name=None, profile=None, year_columns=(), count_columns=(),
+                 limits=None):
+        self.name = name
+        self.profile = profile
+        self.columns = []
+        self.years = {col: Counter() for col in year_columns}
+        self.counts = {col: Counter() for col in count_columns}
+        # Saved counts for these columns keep only the most frequent values
+        self.limits = dict(limits or {})
+        # Records dropped from truncated counts, so shares stay honest
+        self.other = {}
+        self.date_formats = {}
+        self.field_missingness = {}
+        self.scores = {}
+
+    @classmethod
+    def for_profile(cls, profile, name=None):
+        """Empty aggregates for the columns a pipeline profile charts"""
+        from src.pipeline import PROFILES
+
+        year_columns, count_columns, limits = [], [], {}
+        for method, column, _ in PROFILES[profile]:
+            if method in YEAR_CHARTS:
+                year_columns.append(column)
+            else:
+                count_columns.append(column)
+                if method in TOP_N_CHARTS:
+                    limits[column] = TOP_N_CHARTS[method]
+        return cls(name, profile, year_columns, count_columns, limits)
+
+    @classmethod
+    def from_analyzer(cls, analyzer, profile, name=None):
+        """Aggregates from a finished QualityAnalyzer, reusing its plan's counts"""
+        aggregates = cls.for_profile(profile, name)
+        df, plan = analyzer.df, analyzer.plan
+        aggregates.columns = list(df.columns)
+        for col in aggregates.years:
+            if col in df.columns:
+                aggregates.years[col] = Counter(plan.year_counts(col).to_dict())
+        for col in aggregates.counts:
+            if col in df.columns:
+                aggregates.counts[col] = Counter(plan.value_counts(col).to_dict())
+        return aggregates.set_results(analyzer)
+
+    def set_results(self, analyzer):
+        """Copy the missingness and scores of an analyzer that has run"""
+        self.field_missingness = {col: float(rate) for col, rate in
+                                  analyzer.metrics.get('field_missingness', {}).items()}
+        self.scores = {dim: float(score) for dim, score in analyzer.scores.items()}
+        return self
+
+    def update(self, chunk):
+        """Fold one DataFrame chunk into the running counts"""
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        for col, counter in self.years.items():
+            if col not in chunk.columns:
+                continue
+            if col not in self.date_formats:
+                # Infer the format once so every chunk is parsed the same way
+                self.date_formats[col], _ = infer_date_format(chunk[col])
+            dates = parse_dates(chunk[col], self.date_formats[col], infer=False).dropna()
+            counter.update(dates.dt.year.value_counts().to_dict())
+        for col, counter in self.counts.items():
+            if col in chunk.columns:
+                counter.update(chunk[col].value_counts().to_dict())
+        return self
+
+    def merge(self, other):
+        """Combine aggregates built from a disjoint set of rows"""
+        self.columns = self.columns or list(other.columns)
+        for col, counter in other.years.items():
+            self.years.setdefault(col, Counter()).update(counter)
+        for col, counter in other.counts.items():
+            self.counts.setdefault(col, Counter()).update(counter)
+        for col, count in other.other.items():
+            self.other[col] = self.other.get(col, 0) + count
+        return self
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def year_counts(self, column):
+        """Records per year of a date column, sorted by year"""
+        counts = self.years[column]
+        return pd.Series([counts[year] for year in sorted(counts)], index=sorted(counts),
+                         dtype='int64')
+
+    def value_counts(self, column):
+        """Value counts of a column, most frequent first"""
+        counts = [(value, count) for value, count in self.counts[column].most_common() if count > 0]
+        return pd.Series([count for _, count in counts], index=[value for value, _ in counts],
+                         dtype='int64')
+
+    def _pairs(self, column, counter):
+        pairs = counter.most_common(self.limits.get(column))
+        return [[_builtin(value), int(count)] for value, count in pairs]
+
+    def to_dict(self):
+        """Return a JSON-serializable snapshot; limited columns keep their top values"""
+        other = dict(self.other)
+        for col, limit in self.limits.items():
+            counter = self.counts.get(col, Counter())
+            if len(counter) > limit:
+                kept = sum(count for _, count in counter.most_common(limit))
+                other[col] = other.get(col, 0) + sum(counter.values()) - kept
+        return {
+            'name': self.name,
+            'profile': self.profile,
+            'columns': self.columns,
+            'years': {col: self._pairs(col, counter) for col, counter in self.years.items()},
+            'counts': {col: self._pairs(col, counter) for col, counter in self.counts.items()},
+            'limits': self.limits,
+            'other': other,
+            'field_missingness': self.field_missingness,
+            'scores': self.scores,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls(data['name'], data['profile'], limits=data.get('limits'))
+        aggregates.columns = list(data['columns'])
+        # Pairs rather than objects keep integer keys (years, Year values) intact
+        aggregates.years = {col: Counter(dict(map(tuple, pairs)))
+                            for col, pairs in data['years'].items()}
+        aggregates.counts = {col: Counter(dict(map(tuple, pairs)))
+                             for col, pairs in data['counts'].items()}
+        aggregates.other = dict(data.get('other', {}))
+        aggregates.field_missingness = dict(data.get('field_missingness', {}))
+        aggregates.scores = dict(data.get('scores', {}))
+        return aggregates
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Saved chart aggregates to {path}")
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _builtin(value):
+    return value.item() if hasattr(value, 'item') else value
@@ -0,0 +1,144 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+
+def _shape_table():
+    """Byte lookup table mapping ASCII digits to '9' and ASCII letters to 'A'"""
+    table = np.arange(256, dtype=np.uint8)
+    table[ord('0'):ord('9') + 1] = ord('9')
+    table[ord('A'):ord('Z') + 1] = ord('A')
+    table[ord('a'):ord('z') + 1] = ord('A')
+    return table
+
+
+# Value shapes: 'K1A 0B1' -> 'A9A 9A9'; non-ASCII bytes are kept as they are
+SHAPES = _shape_table()
+
+
+def _text_array(series):
+    """Column as one contiguous Arrow string array (zero-copy for Arrow-backed strings)"""
+    try:
+        arr = pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        arr = None
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if arr is not None and pa.types.is_dictionary(arr.type):
+        arr = arr.dictionary_decode()
+    if arr is None or not (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        # Mixed-type object columns are profiled as their string forms
+        arr = pa.array(series.map(lambda value: value if pd.isna(value) else str(value)),
+                       type=pa.large_string(), from_pandas=True)
+    return arr
+
+
+def _shapes(arr):
+    """The value shapes of a string array, made by one table lookup over its UTF-8 bytes"""
+    validity, offsets, data = arr.buffers()
+    shaped = SHAPES[np.frombuffer(data, dtype=np.uint8)] if data is not None else b''
+    return pa.Array.from_buffers(arr.type, len(arr), [validity, offsets, pa.py_buffer(shaped)],
+                                 arr.null_count, arr.offset)
+
+
+def _text_stats(series):
+    arr = _text_array(series)
+    nulls = arr.null_count
+    non_null = len(arr) - nulls
+    stats = {'nulls': int(nulls), 'distinct': 0}
+    if not non_null:
+        return stats
+
+    stats['distinct'] = len(pc.value_counts(arr)) - (1 if nulls else 0)
+    lengths = pc.utf8_length(arr)
+    length_range = pc.min_max(lengths)
+    shapes = pc.value_counts(_shapes(arr).filter(pc.is_valid(arr)))
+    counts = shapes.field('counts').to_numpy()
+    top = int(np.argmax(counts))
+    stats.update({
+        'min_length': length_range['min'].as_py(),
+        'max_length': length_range['max'].as_py(),
+        'mean_length': pc.mean(lengths).as_py(),
+        'patterns': len(shapes),
+        'top_pattern': shapes.field('values')[top].as_py(),
+        'top_pattern_share': int(counts[top]) / non_null,
+    })
+    return stats
+
+
+def column_stats(series):
+    """Null count, cardinality, dtype and (for text) pattern stats of one column
+
+    Numbers and dates are hashed on their NumPy buffers; text is profiled
+    with Arrow kernels plus a byte lookup over the UTF-8 data. Both release
+    the GIL, so columns can be profiled concurrently on threads.
+    """
+    dtype = series.dtype
+    if (pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype)
+            or pd.api.types.is_timedelta64_dtype(dtype)):
+        stats = {'nulls': int(series.isna().sum()), 'distinct': int(series.nunique())}
+    else:
+        stats = _text_stats(series)
+    return dict(dtype=str(dtype), **stats)
+
+
+def _group_stats(frame, positions):
+    return {position: column_stats(frame.iloc[:, position]) for position in positions}
+
+
+def _frame_stats(frame):
+    return _group_stats(frame, range(frame.shape[1]))
+
+
+def shard_columns(df, shards):
+    """Split column positions into shards of similar byte size (largest first)"""
+    sizes = df.memory_usage(index=False, deep=False).to_numpy()
+    groups = [[] for _ in range(max(1, min(shards, df.shape[1])))]
+    loads = [0] * len(groups)
+    for position in sorted(range(df.shape[1]), key=lambda i: -sizes[i]):
+        lightest = loads.index(min(loads))
+        groups[lightest].append(position)
+        loads[lightest] += sizes[position]
+    return [sorted(group) for group in groups if group]
+
+
+def sharded_column_stats(df, workers=None, executor='thread', shards_per_worker=4):
+    """Per-column stats with column groups spread over a thread or process pool
+
+    Threads share the frame and scale because the NumPy and Arrow kernels
+    release the GIL; processes receive their column group pickled, which suits frames of
+    Python-object columns. Returns {column: stats} in the frame's column order.
+    """
+    workers = workers or os.cpu_count() or 1
+    groups = shard_columns(df, workers * shards_per_worker)
+    if workers == 1 or len(groups) == 1:
+        by_position = _group_stats(df, range(df.shape[1]))
+    elif executor == 'process':
+        by_position = {}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(group, pool.submit(_frame_stats, df.iloc[:, group])) for group in groups]
+            for group, future in futures:
+                for i, stats in future.result().items():
+                    by_position[group[i]] = stats
+    elif executor == 'thread':
+        by_position = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for stats in pool.map(lambda group: _group_stats(df, group), groups):
+                by_position.update(stats)
+    else:
+        raise ValueError(f"Unknown executor '{executor}'; use 'thread' or 'process'")
+    logger.info(f"Profiled {df.shape[1]} columns in {len(groups)} shards on {workers} "
+                f"{executor} workers")
+    return {df.columns[i]: by_position[i] for i in range(df.shape[1])}
+
+
+def null_counts(stats, columns):
+    """Null counts from column stats as a Series aligned to columns (like df.isna().sum())"""
+    return pd.Series([stats[col]['nulls'] for col in columns], index=columns, dtype='int64')
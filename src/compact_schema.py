@@ -0,0 +1,64 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.date_parsing import is_date_named
+
+logger = logging.getLogger(__name__)
+
+
+def infer_compact_dtypes(sample, category_ratio=0.5, max_categories=10_000):
+    """read_csv dtypes that store low-cardinality text columns as categoricals
+
+    A text column becomes categorical when the sample's distinct values are at
+    most category_ratio of its non-missing values and no more than
+    max_categories. Date-named columns are left as text for the date parser.
+    """
+    dtypes = {}
+    for col in sample.columns:
+        series = sample[col]
+        if is_date_named(str(col)):
+            continue
+        if not (pd.api.types.is_string_dtype(series) or series.dtype == object):
+            continue
+        non_null = series.notna().sum()
+        distinct = series.nunique(dropna=True)
+        if non_null and distinct <= max_categories and distinct <= category_ratio * non_null:
+            dtypes[col] = 'category'
+    return dtypes
+
+
+def downcast_numeric(df, floats=True):
+    """Shrink integer and float columns in place to the smallest dtype that holds them
+
+    Integers are downcast losslessly. Floats go to float32 (about 7 significant
+    digits) when floats=True and every value fits its range.
+    """
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            kind = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+            df[col] = pd.to_numeric(series, downcast=kind)
+        elif floats and pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            finite = series.dropna()
+            limit = np.finfo(np.float32).max
+            if finite.empty or finite.abs().max() <= limit:
+                df[col] = series.astype(np.float32)
+    return df
+
+
+def memory_report(df, sample=None, total_rows=None):
+    """Bytes used by df, with the default-dtype size extrapolated from a sample"""
+    after = int(df.memory_usage(deep=True, index=False).sum())
+    report = {'rows': len(df), 'columns': len(df.columns), 'bytes_after': after,
+              'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()}}
+    if sample is not None and len(sample):
+        sample = sample[[col for col in df.columns if col in sample.columns]]
+        per_row = sample.memory_usage(deep=True, index=False).sum() / len(sample)
+        before = int(per_row * (total_rows if total_rows is not None else len(df)))
+        report['bytes_before_estimate'] = before
+        report['reduction'] = before / after if after else None
+    return report
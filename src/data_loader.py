@@ -1,139 +1,290 @@
+import io
 import pandas as pd
-import xml.etree.ElementTree as ET
-from lxml import etree
 import logging
 import numpy as np
+from src.profiling import profiled
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# CIPO XML element names (local names, any namespace) feeding each sample-data column
+CIPO_XML_FIELDS = {
+    'ApplicationNumber': ('ApplicationNumber',),
+    'FilingDate': ('ApplicationDate', 'FilingDate'),
+    'MarkCategory': ('MarkCategory',),
+    'MarkFeature': ('MarkFeature',),
+    'MarkDescription': ('MarkDescription', 'MarkVerbalElementText'),
+    'ImageFile': ('MarkImageFilename', 'ImageFile'),
+    'CurrentStatus': ('MarkCurrentStatusCode', 'CurrentStatus'),
+    'Classification': ('ClassNumber', 'Classification'),
+}
+
+
+class ByteRangeReader(io.RawIOBase):
+    """Read-only binary stream over bytes [start, end) of a file"""
+    
+    def __init__(self, filepath, start=0, end=None):
+        self._file = open(filepath, 'rb')
+        self._file.seek(start)
+        self._remaining = None if end is None else max(0, end - start)
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        size = len(buffer)
+        if self._remaining is not None:
+            size = min(size, self._remaining)
+        if size == 0:
+            return 0
+        n = self._file.readinto(memoryview(buffer)[:size])
+        if self._remaining is not None:
+            self._remaining -= n
+        return n
+    
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def last_line_end(filepath, start=0, block_size=1 << 16):
+    """Return the offset just past the last newline at or after start"""
+    with open(filepath, 'rb') as f:
+        pos = f.seek(0, io.SEEK_END)
+        while pos > start:
+            read_from = max(start, pos - block_size)
+            f.seek(read_from)
+            block = f.read(pos - read_from)
+            idx = block.rfind(b'\n')
+            if idx != -1:
+                return read_from + idx + 1
+            pos = read_from
+    return start
+
+
 class DataLoader:
     """Loads and parses regulatory datasets"""
     
-    def __init__(self):
+    def __init__(self, cache_dir=None, cache_max_bytes=2 * 1024 ** 3, compact=False,
+                 sample_rows=10_000, workers=None):
         self.data = None
+        self.compact = compact
+        self.sample_rows = sample_rows
+        self.workers = workers
+        self.load_report = None
+        self.read_report = None
+        self.cache = None
+        if cache_dir is not None:
+            from src.dataset_cache import DatasetCache
+            self.cache = DatasetCache(cache_dir, max_bytes=cache_max_bytes)
     
-    def load_csv(self, filepath):
-        """Load CSV dataset"""
-        logger.info(f"Loading CSV from {filepath}")
+    def _from_cache(self, filepath, kind, columns):
+        if self.cache is None:
+            return None
         try:
-            df = pd.read_csv(filepath, encoding='utf-8')
-            logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns")
+            return self.cache.get(filepath, kind=kind, columns=columns)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry for {filepath}: {e}")
+            self.cache.invalidate(filepath, kind)
+            return None
+    
+    def _to_cache(self, filepath, df, kind, columns):
+        if self.cache is not None and not df.empty:
+            self.cache.put(filepath, df, kind=kind)
+        if columns is not None:
+            df = df[[col for col in columns if col in df.columns]]
+        return df
+    
+    def _read(self, filepath, columns=None, compact=False, strip_columns=False):
+        """Parse a CSV in parallel byte ranges, optionally with a compact schema"""
+        from src.parallel_csv import sniff_csv, read_csv_parallel
+        
+        fmt = sniff_csv(filepath)
+        if not compact:
+            df, self.read_report = read_csv_parallel(filepath, self.workers, fmt)
+            if strip_columns:
+                df.columns = df.columns.str.strip()
             return df
+        
+        from src.compact_schema import infer_compact_dtypes, downcast_numeric, memory_report
+        
+        sample = pd.read_csv(filepath, nrows=self.sample_rows, encoding_errors='replace',
+                             **fmt.read_kwargs())
+        read_kwargs = {'dtype': infer_compact_dtypes(sample)}
+        # Prune columns at parse time unless the full frame is wanted for the cache
+        if columns is not None and self.cache is None:
+            wanted = set(columns)
+            read_kwargs['usecols'] = lambda col: (col.strip() if strip_columns else col) in wanted
+        
+        df, self.read_report = read_csv_parallel(filepath, self.workers, fmt, **read_kwargs)
+        df = downcast_numeric(df)
+        if strip_columns:
+            df.columns = df.columns.str.strip()
+            sample.columns = sample.columns.str.strip()
+        
+        self.load_report = memory_report(df, sample, len(df))
+        if 'reduction' in self.load_report:
+            logger.info(f"Compact load: {self.load_report['bytes_before_estimate'] / 1e6:.1f} MB -> "
+                        f"{self.load_report['bytes_after'] / 1e6:.1f} MB "
+                        f"({self.load_report['reduction']:.1f}x smaller)")
+        return df
+    
+    @profiled
+    def load_csv(self, filepath, columns=None, compact=None):
+        """Load CSV dataset, optionally keeping only the given columns
+        
+        With compact=True (or DataLoader(compact=True)) low-cardinality text
+        columns load as categoricals and numbers are downcast; see load_report.
+        The encoding is sniffed once and large files are parsed in parallel byte
+        ranges; undecodable bytes are replaced and listed in read_report.
+        """
+        compact = self.compact if compact is None else compact
+        kind = 'csv-compact' if compact else 'csv'
+        cached = self._from_cache(filepath, kind, columns)
+        if cached is not None:
+            return cached
+        
+        logger.info(f"Loading CSV from {filepath}")
+        try:
+            df = self._read(filepath, columns, compact)
         except Exception as e:
-            logger.error(f"Error loading CSV: {e}")
-            try:
-                df = pd.read_csv(filepath, encoding='latin-1')
-                return df
-            except:
-                return pd.DataFrame()
-    
-    def create_sample_data(self, n_records=1000):
+            logger.error(f"Error loading CSV {filepath}: {e}")
+            raise
+        logger.info(f"Loaded {len(df)} records with {len(df.columns)} columns "
+                    f"({self.read_report['encoding']}, {self.read_report['chunks']} chunks)")
+        return self._to_cache(filepath, df, kind, columns)
+    
+    @profiled
+    def load_files(self, source, max_workers=8, sheet_name=None):
+        """Load a directory, glob or list of CSV/XLSX files into one DataFrame
+        
+        Files are read concurrently on a bounded thread pool, XLSX sheets are
+        streamed read-only, and column names are stripped and unioned.
+        """
+        from src.multi_file import MultiFileLoader
+        
+        return MultiFileLoader(max_workers, sheet_name=sheet_name).load(source)
+    
+    def iter_csv(self, filepath, chunksize=100_000, encoding=None):
+        """Yield a CSV dataset as DataFrame chunks of at most chunksize rows
+        
+        The encoding and dialect are sniffed as load_csv does (encoding
+        overrides the sniffed one), and undecodable bytes are replaced.
+        """
+        from src.parallel_csv import sniff_csv
+        
+        logger.info(f"Streaming CSV from {filepath} in chunks of {chunksize}")
+        read_kwargs = sniff_csv(filepath).read_kwargs()
+        if encoding is not None:
+            read_kwargs['encoding'] = encoding
+        with pd.read_csv(filepath, chunksize=chunksize, encoding_errors='replace',
+                         **read_kwargs) as reader:
+            for chunk in reader:
+                yield chunk
+    
+    def load_cipo_xml(self, filepath, batch_size=50_000, record_tag='TradeMark'):
+        """Stream a CIPO trademark XML file as DataFrame batches"""
+        logger.info(f"Streaming CIPO XML from {filepath} in batches of {batch_size}")
+        from lxml import etree
+        
+        tag_to_field = {}
+        for field, tags in CIPO_XML_FIELDS.items():
+            for tag in tags:
+                tag_to_field.setdefault(tag, field)
+        columns = list(CIPO_XML_FIELDS)
+        
+        rows = []
+        total = 0
+        context = etree.iterparse(filepath, events=('end',), tag=f'{{*}}{record_tag}',
+                                  huge_tree=True)
+        for _, elem in context:
+            record = dict.fromkeys(columns)
+            for child in elem.iterdescendants():
+                if not isinstance(child.tag, str):
+                    continue
+                field = tag_to_field.get(etree.QName(child).localname)
+                if field is None or record[field] is not None:
+                    continue
+                text = (child.text or '').strip()
+                if not text:
+                    continue
+                if etree.QName(child).localname == 'ClassNumber':
+                    text = f'Nice Class {int(text) if text.isdigit() else text}'
+                record[field] = text
+            rows.append(record)
+            
+            # Drop the processed record and any earlier siblings so memory stays flat
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+            
+            if len(rows) >= batch_size:
+                total += len(rows)
+                yield pd.DataFrame(rows, columns=columns)
+                rows = []
+        del context
+        
+        if rows:
+            total += len(rows)
+            yield pd.DataFrame(rows, columns=columns)
+        logger.info(f"Streamed {total} trademark records from XML")
+    
+    @profiled
+    def create_sample_data(self, n_records=1000, seed=42):
         """Create sample CIPO-like dataset"""
-        from datetime import datetime, timedelta
+        from src.sample_data import generate_cipo_chunk
         
         logger.info(f"Creating sample CIPO dataset with {n_records} records")
-        
-        np.random.seed(42)
-        
-        def generate_filing_dates(n):
-            dates = []
-            for _ in range(n):
-                rand = np.random.random()
-                if rand < 0.70:
-                    year = np.random.randint(1980, 2000)
-                elif rand < 0.85:
-                    year = np.random.randint(2000, 2010)
-                elif rand < 0.95:
-                    year = np.random.randint(2010, 2020)
-                else:
-                    year = np.random.randint(2020, 2026)
-                month = np.random.randint(1, 13)
-                day = np.random.randint(1, 28)
-                dates.append(f'{year}-{month:02d}-{day:02d}')
-            return dates
-        
-        data = {
-            'ApplicationNumber': [f'CA{1000000 + i}' for i in range(n_records)],
-            'FilingDate': generate_filing_dates(n_records),
-            'MarkCategory': np.random.choice(
-                ['Word', 'Design', 'Combined', None], 
-                n_records, 
-                p=[0.15, 0.03, 0.02, 0.80]
-            ),
-            'MarkFeature': np.random.choice(
-                ['Standard', 'Color', None], 
-                n_records, 
-                p=[0.10, 0.05, 0.85]
-            ),
-            'MarkDescription': [
-                f'Trademark {i}' if np.random.random() > 0.82 else None 
-                for i in range(n_records)
-            ],
-            'ImageFile': np.random.choice(
-                ['image.png', None], 
-                n_records, 
-                p=[0.15, 0.85]
-            ),
-            'CurrentStatus': np.random.choice(
-                ['Registered', 'Pending', 'Abandoned', 'Dead'], 
-                n_records
-            ),
-            'Classification': np.random.choice(
-                [f'Nice Class {i}' for i in range(1, 46)], 
-                n_records
-            )
-        }
-        
-        df = pd.DataFrame(data)
+        df = generate_cipo_chunk(np.random.default_rng([seed, 0]), 0, n_records)
         logger.info(f"Created {len(df)} sample trademark records")
         return df
     
-    def load_ontario_employment(self, filepath='data/ontario_employment.csv'):
-        """Load Ontario employment standards dataset"""
+    def write_sample_data(self, filepath, schema='cipo', n_records=1000,
+                          chunk_size=1_000_000, seed=42):
+        """Stream a synthetic CIPO or Ontario dataset to CSV, Parquet or Arrow"""
+        from src.sample_data import write_sample_data
+        return write_sample_data(filepath, schema, n_records, chunk_size, seed)
+    
+    @profiled
+    def load_ontario_employment(self, filepath='data/ontario_employment.csv', columns=None,
+                                compact=None, sample_fallback=True):
+        """Load Ontario employment standards dataset
+        
+        A missing or unreadable file falls back to 1000 sample records unless
+        sample_fallback is False, in which case the error is raised.
+        """
         logger.info(f"Loading Ontario employment data from {filepath}")
+        compact = self.compact if compact is None else compact
+        kind = 'ontario-compact' if compact else 'ontario'
         
         try:
-            df = pd.read_csv(filepath, encoding='utf-8')
-            df.columns = df.columns.str.strip()
+            cached = self._from_cache(filepath, kind, columns)
+            if cached is not None:
+                return cached
+            
+            df = self._read(filepath, columns, compact, strip_columns=True)
             logger.info(f"Loaded {len(df)} employment violation records")
-            return df
+            return self._to_cache(filepath, df, kind, columns)
             
         except FileNotFoundError:
+            if not sample_fallback:
+                raise
             logger.warning(f"File not found: {filepath}")
             logger.info("Creating sample Ontario employment data...")
             return self.create_sample_ontario_data()
             
         except Exception as e:
+            if not sample_fallback:
+                raise
             logger.error(f"Error loading Ontario data: {e}")
             return self.create_sample_ontario_data()
     
-    def create_sample_ontario_data(self, n_records=1000):
+    @profiled
+    def create_sample_ontario_data(self, n_records=1000, seed=42):
         """Create sample Ontario employment violations data"""
-        logger.info(f"Creating sample Ontario dataset with {n_records} records")
+        from src.sample_data import generate_ontario_chunk
         
-        np.random.seed(42)
-        
-        data = {
-            'ViolationType': np.random.choice(
-                ['Wage Theft', 'Overtime', 'Termination', 'Vacation', 'Holiday', 'Other'],
-                n_records,
-                p=[0.35, 0.17, 0.27, 0.13, 0.05, 0.03]
-            ),
-            'Year': np.random.randint(2012, 2025, n_records),
-            'City': np.random.choice(
-                ['Toronto', 'Ottawa', 'Hamilton', 'London', 'Mississauga', 'Other'],
-                n_records,
-                p=[0.35, 0.15, 0.12, 0.08, 0.08, 0.22]
-            ),
-            'Amount': np.random.uniform(500, 50000, n_records).round(2),
-            'Status': np.random.choice(
-                ['Resolved', 'Pending', 'In Progress'],
-                n_records,
-                p=[0.7, 0.2, 0.1]
-            )
-        }
-        
-        df = pd.DataFrame(data)
+        logger.info(f"Creating sample Ontario dataset with {n_records} records")
+        df = generate_ontario_chunk(np.random.default_rng([seed, 0]), 0, n_records)
         logger.info(f"Created {len(df)} sample violation records")
         return df
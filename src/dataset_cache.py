@@ -0,0 +1,208 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    feather = None
+
+
+def file_content_hash(filepath, block_size=1 << 20):
+    """Return a BLAKE2b digest of the file contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Columnar on-disk cache of parsed datasets (uncompressed Arrow IPC files)
+
+    Entries are keyed by source path, size, mtime and content hash. Files are
+    written uncompressed so reads can memory-map them and select columns
+    without copying the rest of the table.
+    """
+
+    INDEX_FILE = 'index.json'
+    # A hit only rewrites the index when the stored access time is older than this
+    ACCESS_RESOLUTION = 3600
+
+    def __init__(self, cache_dir='.cache/datasets', max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = pa is not None
+        self.index = {}
+        self._hashes = {}
+        if not self.enabled:
+            logger.warning("pyarrow not installed; dataset cache disabled")
+            return
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._read_index()
+
+    def _index_path(self):
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    def _read_index(self):
+        try:
+            with open(self._index_path()) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_index(self):
+        tmp = self._index_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self._index_path())
+
+    def _source_info(self, filepath, kind):
+        stat = os.stat(filepath)
+        return {
+            'path': os.path.abspath(filepath),
+            'kind': kind,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    def _content_hash(self, info):
+        """Content hash of a source, computed at most once per (size, mtime)"""
+        stat_key = (info['path'], info['size'], info['mtime_ns'])
+        if stat_key not in self._hashes:
+            self._hashes[stat_key] = file_content_hash(info['path'])
+        return self._hashes[stat_key]
+
+    def _find_entry(self, info):
+        """Return (key, entry, changed) for a source, hashing contents only when stat changed
+
+        changed is True when a touched but identical file had its mtime refreshed.
+        """
+        candidates = [
+            (key, entry) for key, entry in self.index.items()
+            if entry['path'] == info['path'] and entry['kind'] == info['kind']
+        ]
+        for key, entry in candidates:
+            if entry['size'] == info['size'] and entry['mtime_ns'] == info['mtime_ns']:
+                return key, entry, False
+
+        # Touched but possibly unchanged file: fall back to the content hash
+        same_size = [(k, e) for k, e in candidates if e['size'] == info['size']]
+        if same_size:
+            content_hash = self._content_hash(info)
+            for key, entry in same_size:
+                if entry['content_hash'] == content_hash:
+                    entry['mtime_ns'] = info['mtime_ns']
+                    return key, entry, True
+        return None, None, False
+
+    def get(self, filepath, kind='csv', columns=None):
+        """Return the cached DataFrame for filepath, or None on a miss"""
+        if not self.enabled:
+            return None
+        info = self._source_info(filepath, kind)
+        key, entry, changed = self._find_entry(info)
+        if entry is None:
+            return None
+
+        data_path = os.path.join(self.cache_dir, entry['file'])
+        if not os.path.exists(data_path):
+            self.index.pop(key, None)
+            self._write_index()
+            return None
+
+        if columns is not None:
+            columns = [col for col in columns if col in entry['columns']]
+        table = feather.read_table(data_path, columns=columns, memory_map=True)
+        now = time.time()
+        if changed or now - entry['last_access'] > self.ACCESS_RESOLUTION:
+            entry['last_access'] = now
+            self._write_index()
+        logger.info(f"Cache hit for {filepath} ({table.num_rows} rows, {table.num_columns} columns)")
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def put(self, filepath, df, kind='csv'):
+        """Store a parsed DataFrame for filepath, replacing stale entries"""
+        if not self.enabled:
+            return None
+        info = self._source_info(filepath, kind)
+        # Reuses the hash get() computed for a touched file of the same size and mtime
+        info['content_hash'] = self._content_hash(info)
+        key = hashlib.blake2b(
+            json.dumps(info, sort_keys=True).encode(), digest_size=16
+        ).hexdigest()
+
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            logger.warning(f"Could not cache {filepath}: {e}")
+            return None
+        if table.nbytes > self.max_bytes:
+            logger.info(f"Not caching {filepath}: larger than the cache limit")
+            return None
+
+        self.invalidate(filepath, kind, write=False)
+        data_file = f'{key}.arrow'
+        feather.write_feather(table, os.path.join(self.cache_dir, data_file),
+                              compression='uncompressed')
+        self.index[key] = dict(
+            info,
+            file=data_file,
+            columns=list(table.column_names),
+            bytes=os.path.getsize(os.path.join(self.cache_dir, data_file)),
+            last_access=time.time(),
+        )
+        self._evict()
+        self._write_index()
+        logger.info(f"Cached {filepath} as {data_file}")
+        return key
+
+    def invalidate(self, filepath, kind=None, write=True):
+        """Drop every cache entry for filepath"""
+        if not self.enabled:
+            return 0
+        path = os.path.abspath(filepath)
+        stale = [
+            key for key, entry in self.index.items()
+            if entry['path'] == path and (kind is None or entry['kind'] == kind)
+        ]
+        for key in stale:
+            self._remove(key)
+        if write and stale:
+            self._write_index()
+        return len(stale)
+
+    def clear(self):
+        """Remove every cached dataset"""
+        if not self.enabled:
+            return
+        for key in list(self.index):
+            self._remove(key)
+        self._write_index()
+
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self.index.values())
+
+    def _remove(self, key):
+        entry = self.index.pop(key)
+        try:
+            os.remove(os.path.join(self.cache_dir, entry['file']))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Evict least recently used entries until the cache fits max_bytes"""
+        by_age = sorted(self.index.items(), key=lambda item: item[1]['last_access'])
+        total = self.total_bytes()
+        for key, entry in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= entry['bytes']
+            logger.info(f"Evicting cached dataset {entry['path']}")
+            self._remove(key)
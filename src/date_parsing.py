@@ -0,0 +1,140 @@
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Explicit formats tried, in order, when inferring a column's date format
+CANDIDATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y/%m/%d',
+    '%Y%m%d',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+    '%d-%m-%Y',
+    '%d-%b-%Y',
+    '%d %b %Y',
+    '%b %d, %Y',
+    '%B %d, %Y',
+]
+
+# pandas 2 parses a column with one inferred format unless given format='mixed';
+# pandas 1.x reads 'mixed' as a strftime pattern but already parses per element
+MIXED_FORMAT = {'format': 'mixed'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
+# Loose shape every candidate format shares: digits followed by a separator, or YYYYMMDD
+DATE_SHAPE = r'\d{1,4}[-/., ]+\w|^\d{8}$'
+
+
+class DateParseResult:
+    """Parsed datetime64 column plus how it was parsed"""
+
+    def __init__(self, values, date_format, non_null, fallback_count):
+        self.values = values
+        self.format = date_format
+        self.non_null = non_null
+        self.fallback_count = fallback_count
+        self.parsed = int(values.notna().sum())
+
+    @property
+    def unparseable(self):
+        return self.non_null - self.parsed
+
+    @property
+    def unparseable_rate(self):
+        """Share of non-missing values that could not be parsed"""
+        return self.unparseable / self.non_null if self.non_null else 0.0
+
+    def dropna(self):
+        return self.values.dropna()
+
+
+def _sample(series, sample_size):
+    values = series.dropna()
+    if len(values) > sample_size:
+        values = values.sample(sample_size, random_state=0)
+    return values.astype(str).str.strip()
+
+
+def infer_date_format(series, sample_size=1000, min_rate=0.5):
+    """Return (format, success rate) of the best candidate format on a sample
+
+    The format is None when no candidate parses at least min_rate of the sample.
+    """
+    sample = _sample(series, sample_size)
+    if sample.empty:
+        return None, 0.0
+
+    best_format, best_rate = None, 0.0
+    for date_format in CANDIDATE_FORMATS:
+        rate = pd.to_datetime(sample, format=date_format, errors='coerce').notna().mean()
+        if rate > best_rate:
+            best_format, best_rate = date_format, rate
+            if rate == 1.0:
+                break
+    if best_rate < min_rate:
+        return None, best_rate
+    return best_format, best_rate
+
+
+def parse_dates(series, date_format=None, infer=True, first_pass=None):
+    """Parse a column in bulk with one explicit format, falling back per element
+
+    Only values the explicit format rejects go through pandas' slow mixed-format
+    path; anything still unparseable becomes NaT. first_pass(series, format)
+    may replace the bulk pd.to_datetime call if it returns the same values.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return DateParseResult(series, None, int(series.notna().sum()), 0)
+
+    if date_format is None and infer:
+        date_format, _ = infer_date_format(series)
+
+    non_null = series.notna()
+    if date_format is not None:
+        if first_pass is not None:
+            values = first_pass(series, date_format)
+        else:
+            values = pd.to_datetime(series, format=date_format, errors='coerce')
+    else:
+        values = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+
+    leftover = non_null & values.isna()
+    fallback_count = int(leftover.sum())
+    if fallback_count:
+        text = series[leftover].astype(str).str.strip()
+        retry = pd.to_datetime(text, format=date_format, errors='coerce') if date_format else None
+        if retry is None or retry.isna().any():
+            slow = text if retry is None else text[retry.isna()]
+            slow = pd.to_datetime(slow, errors='coerce', **MIXED_FORMAT)
+            retry = slow if retry is None else retry.fillna(slow)
+        values = values.copy()
+        values[leftover] = retry
+    return DateParseResult(values, date_format, int(non_null.sum()), fallback_count)
+
+
+def is_date_named(column):
+    return 'date' in column.lower() or 'Date' in column
+
+
+def detect_date_columns(df, sample_size=200, threshold=0.8):
+    """Return date columns: named like dates, datetime-typed, or parseable by content"""
+    named = [col for col in df.columns if is_date_named(col)]
+    detected = []
+    for col in df.columns:
+        if col in named:
+            continue
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            detected.append(col)
+        elif pd.api.types.is_string_dtype(series) or series.dtype == object:
+            # Cheap shape check first so free-text and code columns skip format trials
+            sample = _sample(series, sample_size)
+            if sample.empty or sample.str.contains(DATE_SHAPE).mean() < threshold:
+                continue
+            date_format, rate = infer_date_format(sample, sample_size, min_rate=threshold)
+            if date_format is not None:
+                detected.append(col)
+    return named + detected
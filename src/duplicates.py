@@ -0,0 +1,400 @@
+import logging
+import math
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Joins composite key parts; chosen because it does not occur in regulatory text fields
+KEY_SEPARATOR = '\x1f'
+MISSING_KEY = '\x00NA'
+
+
+def key_values(chunk, key_columns):
+    """One comparable key per row: key_text of one column, joined key_text for several
+
+    Text keys hash alike however each chunk inferred the column's dtype.
+    """
+    if len(key_columns) == 1:
+        return key_text(chunk[key_columns[0]])
+    parts = [key_text(chunk[col]).fillna(MISSING_KEY) for col in key_columns]
+    return parts[0].str.cat(parts[1:], sep=KEY_SEPARATOR)
+
+
+def key_hashes(keys):
+    # Keys are mostly distinct, so factorizing before hashing (categorize=True) only adds work
+    hashes = pd.util.hash_pandas_object(keys, index=False, categorize=False).to_numpy(
+        dtype=np.uint64, copy=True)
+    # Keep the categorize=True convention that every missing key hashes alike
+    hashes[keys.isna().to_numpy()] = np.iinfo(np.uint64).max
+    return hashes
+
+
+def _display_key(key, key_columns):
+    if len(key_columns) == 1:
+        return key
+    return tuple(None if part == MISSING_KEY else part for part in key.split(KEY_SEPARATOR))
+
+
+class ExactDuplicateCounter:
+    """Exact duplicate counts via hash partitions spilled to disk
+
+    Each chunk's keys are routed by hash to one of `partitions` spill files,
+    so equal keys always land in the same file. result() then loads one
+    partition at a time, keeping peak memory near total keys / partitions,
+    and finishes the counter: its spill files are deleted and add() or
+    merge() afterwards raise RuntimeError. Counters built on other rows
+    with the same number of partitions combine with merge().
+    """
+
+    mode = 'exact'
+
+    def __init__(self, key_columns=('ApplicationNumber',), partitions=64, spill_dir=None,
+                 sample_size=20):
+        self.key_columns = list(key_columns)
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.sample_size = sample_size
+        self.rows = 0
+        # Spill files are opened by the first add(); use as a context manager or close()
+        self._dir = None
+        self._files = []
+        self._result = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("Duplicate counter already finished by result() or close(); "
+                               "build a new counter for more rows")
+
+    def _open(self):
+        self._dir = tempfile.mkdtemp(prefix='yssl-dups-', dir=self.spill_dir)
+        self._files = [open(os.path.join(self._dir, f'part-{i:04d}.pkl'), 'wb')
+                       for i in range(self.partitions)]
+
+    def add(self, chunk):
+        """Spill one chunk's keys to their hash partitions"""
+        self._check_open()
+        keys = key_values(chunk, self.key_columns).to_numpy(dtype=object)
+        self.rows += len(keys)
+        if not len(keys):
+            return self
+        if self._dir is None:
+            self._open()
+
+        part = (key_hashes(pd.Series(keys)) % np.uint64(self.partitions)).astype(np.int64)
+        order = np.argsort(part, kind='stable')
+        bounds = np.cumsum(np.bincount(part, minlength=self.partitions))[:-1]
+        for i, block in enumerate(np.split(keys[order], bounds)):
+            if len(block):
+                pickle.dump(block, self._files[i], protocol=pickle.HIGHEST_PROTOCOL)
+        return self
+
+    def merge(self, other):
+        """Take over the spilled keys of a counter built from other rows"""
+        self._check_open()
+        other._check_open()
+        if other.partitions != self.partitions:
+            raise ValueError(f"Cannot merge exact counters of {self.partitions} and "
+                             f"{other.partitions} partitions")
+        if other._dir is not None:
+            if self._dir is None:
+                self._open()
+            for f in other._files:
+                f.close()
+            # Pickled blocks are read back one after another, so files concatenate
+            for i, target in enumerate(self._files):
+                with open(os.path.join(other._dir, f'part-{i:04d}.pkl'), 'rb') as f:
+                    shutil.copyfileobj(f, target)
+        self.rows += other.rows
+        other.close()
+        return self
+
+    def _read_partition(self, i):
+        blocks = []
+        if self._dir is None:
+            return pd.Series(dtype=object)
+        with open(os.path.join(self._dir, f'part-{i:04d}.pkl'), 'rb') as f:
+            while True:
+                try:
+                    blocks.append(pickle.load(f))
+                except EOFError:
+                    break
+        return pd.Series(np.concatenate(blocks), dtype=object) if blocks else pd.Series(dtype=object)
+
+    def result(self):
+        """Scan every partition and return duplicate counts, rate and sample keys"""
+        if self._result is not None:
+            return self._result
+        self._check_open()
+        for f in self._files:
+            f.close()
+
+        duplicates = 0
+        sample = []
+        for i in range(self.partitions):
+            keys = self._read_partition(i)
+            if keys.empty:
+                continue
+            counts = keys.value_counts(dropna=False)
+            repeated = counts[counts > 1]
+            duplicates += int((repeated - 1).sum())
+            for key in repeated.index[:self.sample_size - len(sample)]:
+                sample.append(_display_key(None if pd.isna(key) else key, self.key_columns))
+        self.close()
+
+        self._result = {
+            'mode': self.mode,
+            'key_columns': self.key_columns,
+            'rows': self.rows,
+            'duplicate_count': duplicates,
+            'duplicate_rate': duplicates / self.rows if self.rows else 0.0,
+            'sample_keys': sample,
+        }
+        return self._result
+
+    def close(self):
+        for f in self._files:
+            f.close()
+        self._files = []
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self._closed = True
+
+
+def key_text(keys):
+    """Keys as strings, so 5, 5.0 and '5' from differently inferred chunks compare equal
+
+    Missing keys stay missing.
+    """
+    present = keys.notna()
+    if pd.api.types.is_float_dtype(keys.dtype):
+        values = keys[present]
+        if (values == np.floor(values)).all():
+            keys = keys.astype('Int64')
+    return keys.astype(str).where(present)
+
+
+def _merge_sorted(a, b, out, block):
+    """Merge two sorted arrays into out, holding about two blocks in memory at a time"""
+    i = j = k = 0
+    while i < len(a) or j < len(b):
+        bounds = [x[p + block - 1] for x, p in ((a, i), (b, j)) if p + block < len(x)]
+        if bounds:
+            pivot = min(bounds)
+            next_i, next_j = np.searchsorted(a, pivot, 'right'), np.searchsorted(b, pivot, 'right')
+        else:
+            next_i, next_j = len(a), len(b)
+        part = np.sort(np.concatenate([a[i:next_i], b[j:next_j]]))
+        out[k:k + len(part)] = part
+        i, j, k = next_i, next_j, k + len(part)
+
+
+class KeyHashSet:
+    """Set of 64-bit key hashes kept on disk as sorted segment files
+
+    add() binary-searches the memory-mapped segments for a chunk's hashes and
+    writes the unseen ones as a new segment; the newest segments are merged
+    (block by block) whenever one reaches half the size of the one before,
+    so there are O(log n) of them. Memory stays near one chunk's keys.
+    Keys are compared by hash, so two distinct keys are confused with
+    probability about n**2 / 2**65.
+
+    With a directory, the set persists: segments lists the files that make
+    it up, and release() deletes any other segment file once that list has
+    been saved. Without one, a temporary directory is removed with the set.
+    """
+
+    SEGMENT = re.compile(r'^seg-(\d+)\.npy$')
+
+    def __init__(self, directory=None, segments=(), block_size=1 << 20):
+        self.directory = directory
+        self.temporary = directory is None
+        self.block_size = block_size
+        self.segments = list(segments)
+        self._next = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            ids = [int(m.group(1)) for m in map(self.SEGMENT.match, os.listdir(directory)) if m]
+            self._next = max(ids, default=-1) + 1
+        self.sizes = [len(self._load(name)) for name in self.segments]
+
+    def __len__(self):
+        return sum(self.sizes)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _load(self, name):
+        return np.load(self._path(name), mmap_mode='r')
+
+    def _new_segment(self, size):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix='yssl-keys-')
+            weakref.finalize(self, shutil.rmtree, self.directory, True)
+        name = f'seg-{self._next:08d}.npy'
+        self._next += 1
+        return name, np.lib.format.open_memmap(self._path(name), mode='w+', dtype=np.uint64,
+                                               shape=(size,))
+
+    def add(self, hashes):
+        """Add uint64 key hashes; returns how many were already in the set"""
+        hashes = np.unique(hashes)
+        seen = np.zeros(len(hashes), dtype=bool)
+        for name in self.segments:
+            segment = self._load(name)
+            found = np.minimum(np.searchsorted(segment, hashes), len(segment) - 1)
+            seen |= segment[found] == hashes
+        new = hashes[~seen]
+        if len(new):
+            name, out = self._new_segment(len(new))
+            out[:] = new
+            out.flush()
+            self.segments.append(name)
+            self.sizes.append(len(new))
+            self._compact()
+        return int(seen.sum())
+
+    def update(self, other):
+        """Add every hash of another set; returns how many were already in this one"""
+        return sum(self.add(np.asarray(other._load(name))) for name in other.segments)
+
+    def _compact(self):
+        while len(self.segments) > 1 and 2 * self.sizes[-1] >= self.sizes[-2]:
+            older, newer = self._load(self.segments[-2]), self._load(self.segments[-1])
+            name, out = self._new_segment(len(older) + len(newer))
+            _merge_sorted(older, newer, out, self.block_size)
+            out.flush()
+            size = self.sizes[-2] + self.sizes[-1]
+            del self.segments[-2:], self.sizes[-2:], out, older, newer
+            self.segments.append(name)
+            self.sizes.append(size)
+        if self.temporary:
+            self.release()
+
+    def release(self):
+        """Delete segment files no longer part of the set"""
+        if self.directory is None:
+            return
+        keep = set(self.segments)
+        for name in os.listdir(self.directory):
+            if self.SEGMENT.match(name) and name not in keep:
+                os.remove(self._path(name))
+
+
+def _bit_length(values):
+    """Vectorized int.bit_length() for uint64 arrays"""
+    values = values.copy()
+    length = np.zeros(len(values), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= (np.uint64(1) << np.uint64(shift))
+        length += shift * high
+        values = np.where(high, values >> np.uint64(shift), values)
+    return length + (values > 0)
+
+
+class ApproximateDuplicateCounter:
+    """Approximate duplicate counts from a HyperLogLog distinct-key estimate
+
+    duplicate_count = rows - estimated distinct keys. The register count is
+    sized from error_rate (standard error of the distinct estimate), so memory
+    is 2**precision bytes regardless of feed size. The default (0.2%, 256 KB)
+    keeps a duplicate-free feed well clear of the 1% accuracy threshold;
+    result() reports the error so callers can compare a lower bound instead.
+    Sample keys are drawn from duplicates seen within a single chunk.
+    """
+
+    mode = 'approximate'
+
+    def __init__(self, key_columns=('ApplicationNumber',), error_rate=0.002, sample_size=20):
+        self.key_columns = list(key_columns)
+        self.error_rate = error_rate
+        self.precision = min(18, max(4, math.ceil(math.log2((1.04 / error_rate) ** 2))))
+        self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        self.sample_size = sample_size
+        self.sample = []
+        self.rows = 0
+
+    def add(self, chunk):
+        """Fold one chunk's key hashes into the registers"""
+        keys = key_values(chunk, self.key_columns)
+        self.rows += len(keys)
+        if not len(keys):
+            return self
+
+        hashes = key_hashes(keys)
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+        if len(self.sample) < self.sample_size:
+            for key in keys[keys.duplicated()].drop_duplicates():
+                key = _display_key(None if pd.isna(key) else key, self.key_columns)
+                if key not in self.sample:
+                    self.sample.append(key)
+                if len(self.sample) >= self.sample_size:
+                    break
+        return self
+
+    def merge(self, other):
+        """Combine with a counter built from other rows"""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog counters of precision {self.precision} "
+                             f"and {other.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        self.rows += other.rows
+        self.sample = (self.sample + other.sample)[:self.sample_size]
+        return self
+
+    def distinct_estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return min(float(estimate), float(self.rows))
+
+    def result(self):
+        """Return estimated duplicate counts, rate and sample keys"""
+        distinct = self.distinct_estimate()
+        duplicates = int(round(self.rows - distinct))
+        return {
+            'mode': self.mode,
+            'key_columns': self.key_columns,
+            'rows': self.rows,
+            'duplicate_count': duplicates,
+            'duplicate_rate': duplicates / self.rows if self.rows else 0.0,
+            'sample_keys': self.sample,
+            # One standard error of the distinct estimate, expressed as a rate
+            'duplicate_rate_error': (1.04 / math.sqrt(len(self.registers)) * distinct / self.rows
+                                     if self.rows else 0.0),
+        }
+
+    def close(self):
+        pass
+
+
+def duplicate_counter(key_columns=('ApplicationNumber',), mode='exact', **kwargs):
+    """Build an exact (disk-spilled) or approximate (HyperLogLog) duplicate counter"""
+    if mode == 'exact':
+        return ExactDuplicateCounter(key_columns, **kwargs)
+    if mode == 'approximate':
+        return ApproximateDuplicateCounter(key_columns, **kwargs)
+    raise ValueError(f"Unknown duplicate detection mode: {mode}")
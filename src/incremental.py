@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+
+import pandas as pd
+
+from src.data_loader import ByteRangeReader, last_line_end
+from src.parallel_csv import CsvFormat, sniff_csv
+from src.streaming_analyzer import QualityState, StreamingQualityAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# Bytes just before the checkpoint hashed to detect a rewritten (not appended) file
+TAIL_BYTES = 64 * 1024
+
+
+def _tail_hash(filepath, offset):
+    start = max(0, offset - TAIL_BYTES)
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        return hashlib.blake2b(f.read(offset - start), digest_size=16).hexdigest()
+
+
+class IncrementalAnalyzer:
+    """Re-scores an append-only CSV by processing only rows added since the last run
+
+    The running aggregates (a QualityState) and the byte offset of the last
+    complete line processed are checkpointed to a JSON state file next to the
+    dataset; the keys seen so far live as hash segments in a directory beside
+    it, so a run reads and writes about as much as the delta. The encoding,
+    dialect and header sniffed on the first run are checkpointed too, so
+    every delta range is parsed like the start of the file. If the file
+    shrank or the bytes before the checkpoint changed, the state is
+    discarded and the file is analyzed from the start.
+    """
+
+    def __init__(self, filepath, state_path=None, chunksize=100_000,
+                 key_column='ApplicationNumber'):
+        self.filepath = filepath
+        self.state_path = state_path or f'{filepath}.quality-state.json'
+        self.key_dir = f'{os.path.splitext(self.state_path)[0]}.keys'
+        self.chunksize = chunksize
+        self.key_column = key_column
+        self.format = None
+        self.analyzer = None
+
+    def load_checkpoint(self):
+        """Return (state, offset) from the state file, or a fresh state if unusable
+
+        Sets self.format to the checkpointed CsvFormat, or sniffs the file afresh.
+        """
+        self.format = None
+        state, offset = self._load_state()
+        if self.format is None:
+            self.format = sniff_csv(self.filepath)
+        return state, offset
+
+    def _load_state(self):
+        fresh = QualityState(self.key_column, key_dir=self.key_dir), 0
+        try:
+            with open(self.state_path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return fresh
+        except ValueError as e:
+            logger.warning(f"Ignoring corrupt state file {self.state_path}: {e}")
+            return fresh
+
+        offset = checkpoint['offset']
+        if os.path.getsize(self.filepath) < offset:
+            logger.warning(f"{self.filepath} shrank since the last run; recomputing")
+            return fresh
+        if _tail_hash(self.filepath, offset) != checkpoint['tail_hash']:
+            logger.warning(f"{self.filepath} was rewritten since the last run; recomputing")
+            return fresh
+        if 'format' not in checkpoint:
+            # Checkpoints from before the format was stored were read as UTF-8
+            logger.warning(f"{self.state_path} has no stored CSV format; recomputing")
+            return fresh
+        try:
+            state = QualityState.from_dict(checkpoint['state'], self.key_dir)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring state with unreadable key segments in {self.key_dir}: {e}")
+            return fresh
+        self.format = CsvFormat(**checkpoint['format'])
+        return state, offset
+
+    def save_checkpoint(self, state, offset):
+        """Persist the state and the offset it covers"""
+        checkpoint = {
+            'source': os.path.abspath(self.filepath),
+            'offset': offset,
+            'tail_hash': _tail_hash(self.filepath, offset),
+            'format': self.format.to_dict(),
+            'state': state.to_dict(),
+        }
+        tmp = f'{self.state_path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, self.state_path)
+        # Merged-away segments stay on disk until the state naming their replacement is saved
+        state.seen_keys.release()
+
+    def _delta_chunks(self, start, end):
+        if end <= start:
+            return
+        # Keys are read as text in every run, whatever each range's values look like
+        read_kwargs = dict(self.format.read_kwargs(), dtype={self.key_column: str},
+                           encoding_errors='replace')
+        if start != 0:
+            read_kwargs.update(header=None, names=self.format.columns)
+        with ByteRangeReader(self.filepath, start, end) as raw:
+            with pd.read_csv(raw, chunksize=self.chunksize, **read_kwargs) as reader:
+                for chunk in reader:
+                    yield chunk
+
+    def run(self):
+        """Fold the new rows into the saved state and return the scores"""
+        state, offset = self.load_checkpoint()
+        # Stop at the last complete line so a half-written append is picked up next run
+        end = last_line_end(self.filepath, offset)
+        before = state.row_count
+
+        self.analyzer = StreamingQualityAnalyzer(
+            self._delta_chunks(offset, end), state=state
+        )
+        scores = self.analyzer.analyze_all()
+        logger.info(f"Processed {state.row_count - before} new records "
+                    f"({end - offset} bytes) of {self.filepath}")
+
+        self.save_checkpoint(state, end)
+        return scores
+
+    @property
+    def metrics(self):
+        return self.analyzer.metrics if self.analyzer else {}
+
+    def get_summary_report(self):
+        """Generate summary statistics for the last run"""
+        return self.analyzer.get_summary_report() if self.analyzer else {}
@@ -0,0 +1,201 @@
+import glob
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+from src.parallel_csv import concat_chunks, read_csv_parallel, sniff_csv
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = ('.csv', '.txt', '.xlsx', '.xlsm')
+
+
+def resolve_sources(source, extensions=EXTENSIONS):
+    """Expand a file, directory, glob pattern or list of them into sorted file paths"""
+    if isinstance(source, (list, tuple)):
+        paths = []
+        for item in source:
+            paths.extend(resolve_sources(item, extensions))
+        return list(dict.fromkeys(paths))
+
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+    elif glob.has_magic(source):
+        paths = glob.glob(source, recursive=True)
+    else:
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"No such file or directory: '{source}'")
+        return [source]
+    # Skip Excel lock files (~$book.xlsx) and anything that is not a data file
+    return sorted(path for path in paths
+                  if os.path.isfile(path) and not os.path.basename(path).startswith('~$')
+                  and path.lower().endswith(extensions))
+
+
+def _header(values):
+    return [str(value) if value is not None else f'Unnamed: {i}'
+            for i, value in enumerate(values)]
+
+
+def iter_xlsx(filepath, sheet_name=None, batch_rows=50_000):
+    """Stream one worksheet as DataFrame batches without loading the workbook
+
+    The workbook is opened read-only so rows are parsed from the sheet XML
+    as they are iterated; the first row is the header. sheet_name defaults
+    to the first worksheet.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(filepath, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header(header)
+        batch = []
+        for row in rows:
+            # Read-only sheets can report formatted-but-empty trailing rows
+            if all(value is None for value in row):
+                continue
+            batch.append(row[:len(columns)])
+            if len(batch) >= batch_rows:
+                yield pd.DataFrame.from_records(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _is_xlsx(filepath):
+    return filepath.lower().endswith(('.xlsx', '.xlsm'))
+
+
+def read_file(filepath, sheet_name=None, batch_rows=50_000):
+    """Read one CSV or XLSX file into a DataFrame"""
+    if _is_xlsx(filepath):
+        return concat_chunks(list(iter_xlsx(filepath, sheet_name, batch_rows)))
+    # Files already load concurrently, so each is parsed as one range
+    df, report = read_csv_parallel(filepath, workers=1, fmt=sniff_csv(filepath))
+    if report['decode_errors']:
+        logger.warning(f"{filepath}: replaced undecodable bytes in "
+                       f"{len(report['decode_errors'])} range(s)")
+    return df
+
+
+def reconcile_columns(frames, strip=True):
+    """Align frames on one column list: stripped names, first-seen order, missing as NaN"""
+    columns = {}
+    for frame in frames:
+        if strip:
+            frame.columns = frame.columns.map(lambda col: col.strip() if isinstance(col, str) else col)
+        for col in frame.columns:
+            columns.setdefault(col, None)
+    columns = list(columns)
+    return [frame if list(frame.columns) == columns else frame.reindex(columns=columns)
+            for frame in frames], columns
+
+
+def concat_releasing(frames, columns):
+    """concat_chunks one column at a time, dropping it from the frames once copied
+
+    Peak memory stays near one copy of the data rather than every frame
+    plus the concatenated result.
+    """
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    data = {}
+    for col in columns:
+        data[col] = concat_chunks([frame[[col]] for frame in frames])[col]
+        for frame in frames:
+            del frame[col]
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+
+class MultiFileLoader:
+    """Loads a directory, glob or list of CSV/XLSX files on a bounded thread pool
+
+    pandas' CSV parser and file reads release the GIL, so a drop of many
+    yearly files is read concurrently rather than one after another. At
+    most 2 * max_workers files are in flight, which bounds memory when
+    batches are consumed as they arrive. XLSX sheets are streamed in
+    batches of batch_rows rows as they are consumed, never whole.
+    """
+
+    def __init__(self, max_workers=8, strip_columns=True, sheet_name=None, source_column=None,
+                 batch_rows=50_000):
+        self.max_workers = max_workers
+        self.strip_columns = strip_columns
+        self.sheet_name = sheet_name
+        # When set, a column of this name records the file each row came from
+        self.source_column = source_column
+        self.batch_rows = batch_rows
+        self.files = []
+
+    def _prepare(self, df, filepath):
+        if self.strip_columns:
+            df.columns = df.columns.map(lambda col: col.strip() if isinstance(col, str) else col)
+        if self.source_column:
+            df[self.source_column] = os.path.basename(filepath)
+        return df
+
+    def _read(self, filepath):
+        return self._prepare(read_file(filepath, self.sheet_name), filepath)
+
+    def _open(self, pool, filepath):
+        """A file's pending batches: a parse on the pool for CSV, a lazy reader for XLSX"""
+        if _is_xlsx(filepath):
+            # openpyxl holds the GIL, so a sheet gains nothing from a thread
+            return iter_xlsx(filepath, self.sheet_name, self.batch_rows)
+        return pool.submit(self._read, filepath)
+
+    def iter_batches(self, source):
+        """Yield (filepath, DataFrame) batches in sorted path order
+
+        A CSV file is one batch; an XLSX sheet is one batch per batch_rows rows.
+        """
+        self.files = resolve_sources(source)
+        if not self.files:
+            raise FileNotFoundError(f"No CSV or XLSX files found for {source}")
+        logger.info(f"Loading {len(self.files)} files with {self.max_workers} threads")
+
+        paths = iter(self.files)
+        window = max(1, 2 * self.max_workers)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque()
+            for path in paths:
+                pending.append((path, self._open(pool, path)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                path, batches = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, self._open(pool, next_path)))
+                try:
+                    if isinstance(batches, Future):
+                        yield path, batches.result()
+                        continue
+                    for batch in batches:
+                        yield path, self._prepare(batch, path)
+                except Exception as e:
+                    logger.error(f"Error loading {path}: {e}")
+                    for _, other in pending:
+                        if isinstance(other, Future):
+                            other.cancel()
+                    raise
+
+    def load(self, source):
+        """Read every file and concatenate the batches once into a single DataFrame"""
+        frames = [df for _, df in self.iter_batches(source)]
+        frames, columns = reconcile_columns(frames, strip=False)
+        df = concat_releasing(frames, columns)
+        logger.info(f"Loaded {len(df)} records with {len(columns)} columns "
+                    f"from {len(self.files)} files")
+        return df
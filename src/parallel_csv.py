@@ -0,0 +1,298 @@
+import codecs
+import csv
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from src.data_loader import ByteRangeReader
+
+logger = logging.getLogger(__name__)
+
+SNIFF_BYTES = 1 << 20
+# Tried in order when the file head is not valid UTF-8; latin-1 decodes any byte
+FALLBACK_ENCODINGS = ('cp1252', 'latin-1')
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+
+class CsvFormat:
+    """Encoding, dialect and header layout sniffed from the head of a CSV file"""
+
+    def __init__(self, encoding, delimiter=',', quotechar='"', columns=None, data_start=0,
+                 splittable=True):
+        self.encoding = encoding
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.columns = columns or []
+        self.data_start = data_start
+        # False when rows may span lines or newlines are not single 0x0A bytes
+        self.splittable = splittable
+
+    def read_kwargs(self):
+        return {'encoding': self.encoding, 'sep': self.delimiter, 'quotechar': self.quotechar}
+
+    def to_dict(self):
+        return {'encoding': self.encoding, 'delimiter': self.delimiter,
+                'quotechar': self.quotechar, 'columns': self.columns,
+                'data_start': self.data_start, 'splittable': self.splittable}
+
+
+def detect_encoding(head):
+    """Name the encoding of a file head: BOM, then strict UTF-8, then legacy fallbacks"""
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the end of the sample is still UTF-8
+        if e.reason == 'unexpected end of data' and e.start >= len(head) - 3:
+            return 'utf-8'
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            head.decode(encoding)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return FALLBACK_ENCODINGS[-1]
+
+
+def _complete_lines(head):
+    end = head.rfind(b'\n')
+    return head[:end + 1] if end != -1 else head
+
+
+def sniff_csv(filepath, head_bytes=SNIFF_BYTES):
+    """Detect encoding, delimiter, quoting and columns from one read of the file head"""
+    with open(filepath, 'rb') as f:
+        head = f.read(head_bytes)
+
+    encoding = detect_encoding(head)
+    # UTF-16/32 newlines are multi-byte, so those files are read as one range
+    splittable = not encoding.startswith(('utf-16', 'utf-32'))
+    dialect_sample = _complete_lines(head).decode(encoding, errors='replace')
+
+    try:
+        dialect = csv.Sniffer().sniff(dialect_sample[:1 << 16], delimiters=',;\t|')
+        delimiter, quotechar = dialect.delimiter, dialect.quotechar or '"'
+    except csv.Error:
+        delimiter, quotechar = ',', '"'
+
+    if not splittable:
+        columns = list(pd.read_csv(filepath, encoding=encoding, sep=delimiter,
+                                   quotechar=quotechar, nrows=0).columns)
+        return CsvFormat(encoding, delimiter, quotechar, columns, 0, False)
+
+    header_end = head.find(b'\n')
+    data_start = len(head) if header_end == -1 else header_end + 1
+    columns = list(pd.read_csv(io.BytesIO(head[:data_start]), encoding=encoding,
+                               sep=delimiter, quotechar=quotechar, nrows=0).columns)
+
+    # An odd quote count on any line means quoted fields hold newlines
+    quote = quotechar.encode(encoding)
+    lines = _complete_lines(head[data_start:]).split(b'\n')
+    splittable = all(line.count(quote) % 2 == 0 for line in lines)
+    return CsvFormat(encoding, delimiter, quotechar, columns, data_start, splittable)
+
+
+def _next_line_start(f, offset):
+    """Offset of the first byte after the next newline at or after offset"""
+    f.seek(offset)
+    pos = offset
+    while True:
+        block = f.read(1 << 16)
+        if not block:
+            return pos
+        idx = block.find(b'\n')
+        if idx != -1:
+            return pos + idx + 1
+        pos += len(block)
+
+
+def split_ranges(filepath, start, parts, min_bytes=32 << 20):
+    """Newline-aligned [start, end) byte ranges covering the file from start"""
+    size = os.path.getsize(filepath)
+    if size <= start:
+        return []
+    parts = max(1, min(parts, (size - start) // max(1, min_bytes)))
+    bounds = [start]
+    with open(filepath, 'rb') as f:
+        for i in range(1, parts):
+            target = start + (size - start) * i // parts
+            aligned = _next_line_start(f, max(target, bounds[-1]))
+            if bounds[-1] < aligned < size:
+                bounds.append(aligned)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _parse_range(filepath, start, end, fmt, read_kwargs):
+    """Parse one byte range; decode errors are replaced and reported, not raised"""
+    # A range starting at 0 holds the header (only for files read as one range)
+    header = {'header': 0} if start == 0 else {'header': None, 'names': fmt.columns}
+    kwargs = dict(fmt.read_kwargs(), **header, **read_kwargs)
+    try:
+        with ByteRangeReader(filepath, start, end) as raw:
+            return pd.read_csv(io.BufferedReader(raw, 1 << 20), **kwargs), None
+    except UnicodeDecodeError:
+        pass
+
+    # Only a range with bad bytes is read a second time
+    with ByteRangeReader(filepath, start, end) as raw:
+        data = raw.read()
+    try:
+        data.decode(fmt.encoding)
+        first_bad, reason = None, 'decode error'
+    except UnicodeDecodeError as e:
+        first_bad, reason = start + e.start, e.reason
+    text = data.decode(fmt.encoding, errors='replace')
+    kwargs.pop('encoding')
+    chunk = pd.read_csv(io.StringIO(text), **kwargs)
+    error = {
+        'start': start,
+        'end': end,
+        'rows': len(chunk),
+        'first_error_offset': first_bad,
+        'reason': reason,
+        'replaced_characters': text.count('\ufffd'),
+    }
+    return chunk, error
+
+
+def _as_text(series):
+    """Values as strings, keeping missing values missing"""
+    return series.astype(str).mask(series.isna())
+
+
+def mixed_columns(frames):
+    """Columns parsed as different, not all numeric, dtypes by chunks that hold values
+
+    Concatenating such a column mixes e.g. ints and strings in one object column.
+    """
+    if len(frames) < 2:
+        return []
+    mixed = []
+    for col in frames[0].columns:
+        typed = [frame[col].dtype for frame in frames if frame[col].notna().any()]
+        if len({str(dtype) for dtype in typed}) < 2:
+            continue
+        if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+               for dtype in typed):
+            continue  # int and float chunks concatenate to float, as one read would
+        if any(isinstance(dtype, pd.CategoricalDtype) for dtype in typed):
+            continue
+        mixed.append(col)
+    return mixed
+
+
+def _align_dtypes(frames):
+    """Give all-missing chunk columns the dtype the other chunks agreed on
+
+    Columns the chunks parsed as conflicting types become text in every chunk.
+    """
+    if len(frames) < 2:
+        return frames
+    for col in frames[0].columns:
+        dtypes = {str(frame[col].dtype) for frame in frames}
+        if len(dtypes) == 1:
+            continue
+        typed = [frame[col] for frame in frames if frame[col].notna().any()]
+        if not typed or len({str(s.dtype) for s in typed}) != 1:
+            continue
+        target = typed[0].dtype
+        if isinstance(target, pd.CategoricalDtype):
+            continue
+        for frame in frames:
+            if not frame[col].notna().any() and frame[col].dtype != target:
+                frame[col] = frame[col].astype(target)
+    for col in mixed_columns(frames):
+        for frame in frames:
+            frame[col] = _as_text(frame[col])
+    return frames
+
+
+def concat_chunks(frames, columns=None):
+    """Concatenate per-range frames, unioning categoricals so they stay categorical"""
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    frames = _align_dtypes(frames)
+    df = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype) and \
+                not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = union_categoricals([frame[col] for frame in frames])
+    return df
+
+
+def read_csv_parallel(filepath, workers=None, fmt=None, min_chunk_bytes=32 << 20, **read_kwargs):
+    """Read a CSV by parsing newline-aligned byte ranges in worker processes
+
+    The encoding and dialect are sniffed once from the file head (or taken
+    from fmt). Files smaller than min_chunk_bytes, or whose quoted fields
+    span lines, are parsed as a single range in this process. Returns
+    (df, report); report['decode_errors'] lists the ranges that contained
+    undecodable bytes, which were replaced with U+FFFD.
+    """
+    fmt = fmt or sniff_csv(filepath)
+    workers = workers or os.cpu_count() or 1
+    if callable(read_kwargs.get('usecols')):
+        # Resolve now so the kwargs can be pickled to the workers
+        read_kwargs['usecols'] = [col for col in fmt.columns if read_kwargs['usecols'](col)]
+    if fmt.splittable and workers > 1:
+        ranges = split_ranges(filepath, fmt.data_start, workers, min_chunk_bytes)
+    else:
+        ranges = [(fmt.data_start, os.path.getsize(filepath))]
+        ranges = [r for r in ranges if r[1] > r[0]]
+
+    if len(ranges) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+                futures = [pool.submit(_parse_range, filepath, start, end, fmt, read_kwargs)
+                           for start, end in ranges]
+                results = [future.result() for future in futures]
+        except pd.errors.ParserError as e:
+            # A quoted newline past the sniffed head can misalign a split
+            logger.warning(f"Re-reading {filepath} as one range after a split parse error: {e}")
+            ranges = [(fmt.data_start, ranges[-1][1])]
+            results = [_parse_range(filepath, *ranges[0], fmt, read_kwargs)]
+    else:
+        results = [_parse_range(filepath, start, end, fmt, read_kwargs) for start, end in ranges]
+
+    errors = []
+    for i, (_, error) in enumerate(results):
+        if error is not None:
+            error['chunk'] = i
+            errors.append(error)
+            logger.warning(f"Replaced {error['replaced_characters']} undecodable characters "
+                           f"in {filepath} bytes {error['start']}-{error['end']} "
+                           f"(first at {error['first_error_offset']}, {fmt.encoding})")
+
+    frames = [chunk for chunk, _ in results]
+    mixed = mixed_columns(frames)
+    if mixed and not isinstance(read_kwargs.get('dtype'), str):
+        # Ranges inferred their own dtypes; re-read the ones that did not parse the
+        # disagreeing columns as text, so every value keeps its exact source text
+        text_kwargs = dict(read_kwargs, dtype=dict(read_kwargs.get('dtype') or {},
+                                                   **{col: str for col in mixed}))
+        for i, (start, end) in enumerate(ranges):
+            if any(not pd.api.types.is_string_dtype(frames[i][col]) for col in mixed):
+                frames[i], _ = _parse_range(filepath, start, end, fmt, text_kwargs)
+        logger.info(f"Read {', '.join(map(str, mixed))} in {filepath} as text: "
+                    f"byte ranges inferred conflicting types")
+
+    columns = fmt.columns
+    if read_kwargs.get('usecols') is not None:
+        columns = [col for col in columns if col in read_kwargs['usecols']]
+    df = concat_chunks(frames, columns=columns)
+    report = dict(fmt.to_dict(), chunks=len(ranges), rows=len(df), decode_errors=errors)
+    return df, report
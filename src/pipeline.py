@@ -0,0 +1,280 @@
+import glob
+import json
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+# Charts drawn for each column profile: (plot method, required column, args)
+PROFILES = {
+    'cipo': [
+        ('plot_temporal_distribution', 'FilingDate', ("Trademark Applications by Year",)),
+    ],
+    'ontario': [
+        ('plot_violations_by_type', 'ViolationType', ()),
+        ('plot_violations_by_year', 'Year', ()),
+        ('plot_geographic_distribution', 'City', ()),
+    ],
+}
+
+LOADERS = ('csv', 'ontario', 'cipo_xml', 'files', 'sample', 'sample_ontario')
+
+# Analyzer metrics kept in each run result (and in the run history)
+RESULT_METRICS = ('overall_completeness', 'field_missingness', 'recent_record_rate',
+                  'date_unparseable_rate', 'year_distribution', 'rule_violation_rate',
+                  'record_count', 'field_count', 'column_stats')
+
+
+def dataset_name(path, default):
+    """Default dataset name: a file's stem, or the directory a glob or 'files' path names"""
+    if not isinstance(path, str):
+        return default
+    while glob.has_magic(path):
+        path = os.path.dirname(path)
+    name = os.path.splitext(os.path.basename(os.path.normpath(path)))[0] if path else ''
+    return name or default
+
+
+def load_manifest(path):
+    """Read a batch manifest: a JSON list of dataset specs (or {"datasets": [...]})"""
+    with open(path) as f:
+        manifest = json.load(f)
+    datasets = manifest['datasets'] if isinstance(manifest, dict) else manifest
+    for i, spec in enumerate(datasets):
+        spec.setdefault('name', dataset_name(spec.get('path'), f'dataset_{i}'))
+        spec.setdefault('loader', 'csv')
+        spec.setdefault('profile', 'cipo')
+        spec.setdefault('output_dir', os.path.join('outputs', spec['name']))
+        if spec['loader'] not in LOADERS:
+            raise ValueError(f"Unknown loader '{spec['loader']}' for {spec['name']}")
+        if spec['profile'] not in PROFILES:
+            raise ValueError(f"Unknown profile '{spec['profile']}' for {spec['name']}")
+    return datasets
+
+
+def load_dataset(spec):
+    """Load the DataFrame described by a manifest entry"""
+    import pandas as pd
+    from src.data_loader import DataLoader
+
+    # Datasets already run in parallel, so parse each file in its worker process
+    loader = DataLoader(workers=spec.get('read_workers', 1))
+    kind = spec['loader']
+    if kind == 'csv':
+        return loader.load_csv(spec['path'])
+    if kind == 'ontario':
+        return loader.load_ontario_employment(spec['path'], sample_fallback=False)
+    if kind == 'files':
+        return loader.load_files(spec['path'], spec.get('read_threads', 8))
+    if kind == 'cipo_xml':
+        batches = list(loader.load_cipo_xml(spec['path']))
+        return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+    if kind == 'sample':
+        return loader.create_sample_data(spec.get('n_records', 1000))
+    return loader.create_sample_ontario_data(spec.get('n_records', 1000))
+
+
+def run_dataset(spec, plots=True, chart_data=False):
+    """Run load -> analyze -> visualize for one dataset, capturing any failure
+
+    With chart_data the result also carries the chart aggregates as a dict,
+    so a run history can redraw the charts later without the data.
+    """
+    from src.profiling import StageProfiler
+
+    started = time.time()
+    result = {'name': spec['name'], 'path': spec.get('path'), 'status': 'ok'}
+    with StageProfiler(spec['name']) as profiler:
+        try:
+            _run_stages(spec, plots, result, chart_data)
+        except Exception as e:
+            logger.error(f"Dataset {spec['name']} failed: {e}")
+            result['status'] = 'error'
+            result['error'] = f"{type(e).__name__}: {e}"
+            result['traceback'] = traceback.format_exc()
+    result['stages'] = profiler.summary()
+    result['seconds'] = round(time.time() - started, 3)
+    return result
+
+
+def _run_stages(spec, plots, result, chart_data=False):
+    from src.chart_aggregates import ChartAggregates
+    from src.quality_analyzer import QualityAnalyzer
+
+    df = load_dataset(spec)
+    if df.empty:
+        raise ValueError("No data loaded")
+
+    analyzer = QualityAnalyzer(df, profile=spec['profile'], workers=spec.get('column_workers'),
+                               backend=spec.get('backend', 'pandas'),
+                               column_stats=spec.get('column_stats', False))
+    analyzer.analyze_all()
+    result['summary'] = analyzer.get_summary_report()
+    result['metrics'] = {key: analyzer.metrics[key] for key in RESULT_METRICS
+                         if key in analyzer.metrics}
+    result['charts'] = []
+    # Charts need only these counts, so the rows are released before plotting
+    aggregates = ChartAggregates.from_analyzer(analyzer, spec['profile'], spec['name'])
+    del df, analyzer
+    if chart_data:
+        result['chart_data'] = aggregates.to_dict()
+
+    if plots:
+        from src.visualizer import QualityVisualizer
+
+        viz = QualityVisualizer(output_dir=spec['output_dir'], dpi=spec.get('dpi', 300),
+                                fmt=spec.get('format', 'png'), headless=True)
+        result['aggregates'] = aggregates.save(os.path.join(spec['output_dir'],
+                                                            'chart_aggregates.json'))
+        result['charts'] = [chart for _, chart in draw_charts(viz, aggregates)]
+
+
+def draw_charts(viz, aggregates):
+    """Draw a dataset's profile charts, missingness and radar; returns [(method, path or buffer)]"""
+    charts = []
+    for method, column, args in PROFILES[aggregates.profile]:
+        if column in aggregates:
+            charts.append((method, getattr(viz, method)(aggregates, column, *args)))
+    if aggregates.field_missingness:
+        charts.append(('plot_missingness', viz.plot_missingness(aggregates.field_missingness)))
+    charts.append(('plot_quality_radar',
+                   viz.plot_quality_radar(aggregates.scores, f"{aggregates.name} Data Quality")))
+    return charts
+
+
+def redraw_charts(aggregate_path, output_dir=None, dpi=300, fmt='png'):
+    """Redraw a dataset's charts from its saved chart_aggregates.json, without the source data"""
+    from src.chart_aggregates import ChartAggregates
+    from src.visualizer import QualityVisualizer
+
+    aggregates = ChartAggregates.load(aggregate_path)
+    viz = QualityVisualizer(output_dir=output_dir or os.path.dirname(aggregate_path) or '.',
+                            dpi=dpi, fmt=fmt, headless=True)
+    return [chart for _, chart in draw_charts(viz, aggregates)]
+
+
+def has_charts(result, output_dir):
+    """Whether a (stored) result's charts all still exist in output_dir"""
+    charts = result.get('charts') or []
+    target = os.path.abspath(output_dir)
+    return bool(charts) and all(os.path.exists(chart) and
+                                os.path.abspath(os.path.dirname(chart)) == target
+                                for chart in charts)
+
+
+def replot_stored(stored, spec):
+    """Draw a stored run's charts into spec's output_dir from its chart_data
+
+    Returns (aggregate path, chart paths).
+    """
+    from src.chart_aggregates import ChartAggregates
+    from src.visualizer import QualityVisualizer
+
+    aggregates = ChartAggregates.from_dict(stored['chart_data'])
+    aggregates.name = spec['name']
+    viz = QualityVisualizer(output_dir=spec['output_dir'], dpi=spec.get('dpi', 300),
+                            fmt=spec.get('format', 'png'), headless=True)
+    path = aggregates.save(os.path.join(spec['output_dir'], 'chart_aggregates.json'))
+    return path, [chart for _, chart in draw_charts(viz, aggregates)]
+
+
+def _to_builtin(value):
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def write_summary(results, path):
+    """Write the combined per-dataset results as JSON"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'datasets': results,
+            'succeeded': sum(r['status'] == 'ok' for r in results),
+            'failed': sum(r['status'] != 'ok' for r in results),
+        }, f, indent=2, default=_to_builtin)
+    return path
+
+
+def _stored_result(spec, stored, plots):
+    result = {key: value for key, value in stored.items() if key != 'chart_data'}
+    result.update(name=spec['name'], path=spec.get('path'), status='ok', skipped=True, seconds=0.0)
+    if plots and not has_charts(stored, spec['output_dir']):
+        started = time.time()
+        try:
+            result['aggregates'], result['charts'] = replot_stored(stored, spec)
+        except Exception as e:
+            logger.error(f"Redrawing charts for {spec['name']} failed: {e}")
+            result.update(status='error', error=f"{type(e).__name__}: {e}")
+        result['seconds'] = round(time.time() - started, 3)
+    return result
+
+
+def run_batch(datasets, workers=None, plots=True, history=None):
+    """Run every dataset across a process pool; results keep manifest order
+
+    With a RunHistory, datasets whose content fingerprint was already scored
+    under the same profile return the stored result without running (their
+    charts are redrawn from the stored chart data when plots are wanted but
+    not in the spec's output_dir), and the new successful runs are recorded
+    together at the end.
+    """
+    results = [None] * len(datasets)
+    pending = list(range(len(datasets)))
+    fingerprints = {}
+    if history is not None:
+        from src.run_history import spec_fingerprint
+
+        pending = []
+        for i, spec in enumerate(datasets):
+            try:
+                fingerprints[i] = spec_fingerprint(spec)
+            except OSError:
+                # Missing input: let the run report the error
+                pending.append(i)
+                continue
+            stored = history.lookup(fingerprints[i], spec['profile'])
+            if stored is not None and plots and 'chart_data' not in stored and \
+                    not has_charts(stored, spec['output_dir']):
+                # Recorded before chart data was kept: charts can only come from a rerun
+                stored = None
+            if stored is None:
+                pending.append(i)
+            else:
+                logger.info(f"[skipped] {spec['name']}: already scored as run {stored['run_id']}")
+                results[i] = _stored_result(spec, stored, plots)
+
+    started = time.time()
+    # Recorded runs keep their chart data so later skips can redraw the charts
+    chart_data = history is not None
+    if workers == 1:
+        for i in pending:
+            results[i] = run_dataset(datasets[i], plots, chart_data)
+    elif pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_dataset, datasets[i], plots, chart_data): i for i in pending}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. killed for memory)
+                    results[i] = {'name': datasets[i]['name'], 'path': datasets[i].get('path'),
+                                  'status': 'error', 'error': f"{type(e).__name__}: {e}",
+                                  'seconds': round(time.time() - started, 3)}
+                status = results[i]['status']
+                logger.info(f"[{status}] {datasets[i]['name']}")
+
+    if history is not None:
+        history.record_many([dict(results[i], dataset=datasets[i]['name'],
+                                  profile=datasets[i]['profile'], fingerprint=fingerprints[i])
+                             for i in pending
+                             if results[i]['status'] == 'ok' and i in fingerprints])
+        for i in pending:
+            results[i].pop('chart_data', None)
+    return results
@@ -0,0 +1,227 @@
+import contextvars
+import functools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+_active = contextvars.ContextVar('yssl_profiler', default=None)
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _label(value):
+    """A Prometheus label value with backslashes, quotes and newlines escaped"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _first_frame(*candidates):
+    for value in candidates:
+        if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):
+            return value
+    return None
+
+
+def _throughput(args, result):
+    """Rows and bytes processed by a call, inferred from its arguments and result"""
+    owner = args[0] if args else None
+    frame = _first_frame(result, getattr(owner, 'df', None), *args[1:])
+    info = {}
+    if frame is not None:
+        info['rows'] = len(frame)
+    path = next((a for a in args[1:] if isinstance(a, (str, os.PathLike))), None)
+    if path is not None and os.path.isfile(path):
+        info['bytes'] = os.path.getsize(path)
+    elif frame is not None:
+        info['bytes'] = int(frame.memory_usage(index=False).sum())
+    return info
+
+
+def profiled(func):
+    """Record a stage for each call while a StageProfiler is active; free otherwise"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _active.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.stage(func.__qualname__) as record:
+            result = func(*args, **kwargs)
+            record.update(_throughput(args, result))
+            return result
+    return wrapper
+
+
+class StageProfiler:
+    """Collects wall time, CPU time, memory and throughput for pipeline stages
+
+    Use as a context manager; while active, every @profiled loader, analyzer
+    and visualizer method records a stage. Nested calls are recorded with a
+    '/'-joined path (e.g. 'QualityAnalyzer.analyze_all/QualityAnalyzer.analyze_accuracy').
+    Python allocations are only traced with trace_allocations=True, since
+    tracemalloc slows every allocation down several times.
+    """
+
+    def __init__(self, run_name='yssl', trace_allocations=False):
+        self.run_name = run_name
+        self.run_id = uuid.uuid4().hex[:12]
+        self.trace_allocations = trace_allocations
+        self.stages = []
+        self.started = None
+        self.finished = None
+        self._path = []
+        self._peaks = []
+        self._token = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        self.started = datetime.now(timezone.utc)
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _active.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _active.reset(self._token)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self.finished = datetime.now(timezone.utc)
+        return False
+
+    @contextmanager
+    def stage(self, name, **info):
+        """Measure the enclosed block as one stage; yields a dict for extra fields"""
+        record = {'stage': '/'.join(self._path + [name]), 'name': name}
+        record.update(info)
+        self._path.append(name)
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            alloc_before, peak_so_far = tracemalloc.get_traced_memory()
+            # The traced peak is global: bank the enclosing stage's peak, then reset
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak_so_far)
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+        rss_before = peak_rss_bytes()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        error = None
+        try:
+            yield record
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record['wall_seconds'] = time.perf_counter() - wall_before
+            record['cpu_seconds'] = time.process_time() - cpu_before
+            rss_after = peak_rss_bytes()
+            if rss_after is not None:
+                record['peak_rss_bytes'] = rss_after
+                record['peak_rss_growth_bytes'] = rss_after - rss_before
+            if tracing:
+                alloc_after, alloc_peak = tracemalloc.get_traced_memory()
+                alloc_peak = max(alloc_peak, self._peaks.pop())
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], alloc_peak)
+                record['alloc_delta_bytes'] = alloc_after - alloc_before
+                record['alloc_peak_bytes'] = alloc_peak - alloc_before
+            wall = record['wall_seconds']
+            if wall > 0:
+                if 'rows' in record:
+                    record['rows_per_second'] = record['rows'] / wall
+                if 'bytes' in record:
+                    record['bytes_per_second'] = record['bytes'] / wall
+            if error is not None:
+                record['error'] = error
+            self._path.pop()
+            self.stages.append(record)
+
+    def summary(self):
+        """Totals per stage path, in first-seen order"""
+        totals = {}
+        for record in self.stages:
+            total = totals.setdefault(record['stage'], {
+                'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                'rows': 0, 'bytes': 0, 'peak_rss_bytes': 0, 'alloc_peak_bytes': 0,
+            })
+            total['calls'] += 1
+            for field in ('wall_seconds', 'cpu_seconds', 'rows', 'bytes'):
+                total[field] += record.get(field, 0)
+            for field in ('peak_rss_bytes', 'alloc_peak_bytes'):
+                total[field] = max(total[field], record.get(field) or 0)
+        return totals
+
+    def run_record(self):
+        """Machine-readable description of the whole run"""
+        return {
+            'run_id': self.run_id,
+            'run_name': self.run_name,
+            'started': self.started.isoformat() if self.started else None,
+            'finished': self.finished.isoformat() if self.finished else None,
+            'python': platform.python_version(),
+            'host': platform.node(),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': self.stages,
+            'summary': self.summary(),
+        }
+
+    def write_json(self, path):
+        """Write the run record as JSON"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.run_record(), f, indent=2)
+        return path
+
+    def prometheus_text(self):
+        """Per-stage totals in the Prometheus text exposition format"""
+        metrics = [
+            ('wall_seconds', 'yssl_stage_wall_seconds', 'Wall-clock seconds spent in the stage'),
+            ('cpu_seconds', 'yssl_stage_cpu_seconds', 'CPU seconds spent in the stage'),
+            ('calls', 'yssl_stage_calls', 'Number of times the stage ran'),
+            ('rows', 'yssl_stage_rows', 'Rows processed by the stage'),
+            ('bytes', 'yssl_stage_bytes', 'Bytes processed by the stage'),
+            ('peak_rss_bytes', 'yssl_stage_peak_rss_bytes', 'Process peak RSS at the end of the stage'),
+            ('alloc_peak_bytes', 'yssl_stage_alloc_peak_bytes',
+             'Peak Python allocations during the stage'),
+        ]
+        summary = self.summary()
+        run = _label(self.run_name)
+        lines = []
+        for field, metric, help_text in metrics:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            for stage, total in summary.items():
+                lines.append(f'{metric}{{run="{run}",stage="{_label(stage)}"}} {total[field]}')
+        lines.append('# HELP yssl_run_timestamp_seconds Unix time the run finished')
+        lines.append('# TYPE yssl_run_timestamp_seconds gauge')
+        finished = self.finished or datetime.now(timezone.utc)
+        lines.append(f'yssl_run_timestamp_seconds{{run="{run}"}} {finished.timestamp()}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write a node-exporter textfile (atomically, so scrapes never see half a file)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+        return path
@@ -2,17 +2,75 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
+from src.analysis_plan import AnalysisPlan
+from src.profiling import profiled
+from src.rules import RuleSet, detect_profile
 
 logger = logging.getLogger(__name__)
 
+
+def completeness_score(completeness_rate):
+    """Map an overall completeness rate to a 1-5 score"""
+    if completeness_rate >= 0.9:
+        return 5
+    elif completeness_rate >= 0.7:
+        return 4
+    elif completeness_rate >= 0.5:
+        return 3
+    elif completeness_rate >= 0.3:
+        return 2
+    return 1
+
+
+def timeliness_score(recent_rate):
+    """Map the share of recent records to a 1-5 score"""
+    if recent_rate >= 0.5:
+        return 5
+    elif recent_rate >= 0.3:
+        return 4
+    elif recent_rate >= 0.1:
+        return 3
+    elif recent_rate >= 0.05:
+        return 2
+    return 1
+
+
+def consistency_score(violation_rate):
+    """Map the share of values breaking consistency rules to a 1-5 score"""
+    if violation_rate <= 0.01:
+        return 5
+    elif violation_rate <= 0.05:
+        return 4
+    elif violation_rate <= 0.10:
+        return 3
+    elif violation_rate <= 0.25:
+        return 2
+    return 1
+
+
 class QualityAnalyzer:
-    """Analyzes dataset quality across 5 dimensions"""
+    """Analyzes dataset quality across 5 dimensions
     
-    def __init__(self, df):
+    column_stats=True profiles every column (cardinality, dtype, text lengths
+    and value patterns) into metrics['column_stats']; with workers set the
+    columns are profiled in shards on a thread (or process) pool. Null counts
+    otherwise come from the plan, which is faster than sharding them. backend picks how the
+    plan computes counts and parses dates ('pandas' or 'arrow'); the scores
+    and metrics are the same either way.
+    """
+    
+    def __init__(self, df, plan=None, profile=None, workers=None, executor='thread',
+                 backend='pandas', column_stats=False):
         self.df = df
+        self.plan = plan if plan is not None else AnalysisPlan(df, backend)
+        self.profile = profile or detect_profile(df.columns)
+        self.workers = workers
+        self.executor = executor
+        self.column_stats = column_stats
         self.scores = {}
         self.metrics = {}
     
+    @profiled
     def analyze_all(self):
         """Run all quality assessments"""
         logger.info("Running quality analysis...")
@@ -27,13 +85,14 @@ class QualityAnalyzer:
         logger.info(f"Overall quality score: {self.scores['overall']:.2f}/5")
         return self.scores
     
+    @profiled
     def analyze_accuracy(self):
         """Assess data accuracy"""
         score = 5.0
         issues = []
         
         if 'ApplicationNumber' in self.df.columns:
-            duplicates = self.df['ApplicationNumber'].duplicated().sum()
+            duplicates = self.plan.duplicate_count('ApplicationNumber')
             dup_rate = duplicates / len(self.df)
             if dup_rate > 0.01:
                 score -= 1
@@ -42,60 +101,50 @@ class QualityAnalyzer:
         self.metrics['accuracy_issues'] = issues
         return max(0, min(5, score))
     
+    @profiled
     def analyze_completeness(self):
         """Assess data completeness"""
+        if self.column_stats:
+            from src.column_shards import null_counts, sharded_column_stats
+            
+            stats = sharded_column_stats(self.df, self.workers or 1, self.executor)
+            self.metrics['column_stats'] = stats
+            self.plan.set_null_counts(null_counts(stats, self.df.columns))
+        
         total_cells = self.df.size
-        missing_cells = self.df.isna().sum().sum()
+        missing_cells = self.plan.missing_cells
         completeness_rate = 1 - (missing_cells / total_cells)
         
-        field_missing = (self.df.isna().sum() / len(self.df) * 100).round(2)
+        field_missing = (self.plan.null_counts / len(self.df) * 100).round(2)
         self.metrics['field_missingness'] = field_missing.to_dict()
-        
-        if completeness_rate >= 0.9:
-            score = 5
-        elif completeness_rate >= 0.7:
-            score = 4
-        elif completeness_rate >= 0.5:
-            score = 3
-        elif completeness_rate >= 0.3:
-            score = 2
-        else:
-            score = 1
+        score = completeness_score(completeness_rate)
         
         self.metrics['overall_completeness'] = completeness_rate
         return score
     
+    @profiled
     def analyze_timeliness(self):
         """Assess data timeliness"""
         score = 3.0
-        date_cols = [col for col in self.df.columns if 'date' in col.lower() or 'Date' in col]
+        date_cols = self.plan.date_columns
         
         if not date_cols:
             return score
         
         try:
-            dates = pd.to_datetime(self.df[date_cols[0]], errors='coerce').dropna()
-            if len(dates) == 0:
+            parsed = self.plan.parse_dates(date_cols[0])
+            self.metrics['date_unparseable_rate'] = parsed.unparseable_rate
+            if parsed.parsed == 0:
                 return 1.0
             
             current_year = datetime.now().year
-            recent_records = dates[dates.dt.year >= current_year - 2]
-            recent_rate = len(recent_records) / len(dates)
+            year_dist = self.plan.year_counts(date_cols[0])
+            recent_records = int(year_dist[year_dist.index >= current_year - 2].sum())
+            recent_rate = recent_records / parsed.parsed
             
             self.metrics['recent_record_rate'] = recent_rate
+            score = timeliness_score(recent_rate)
             
-            if recent_rate >= 0.5:
-                score = 5
-            elif recent_rate >= 0.3:
-                score = 4
-            elif recent_rate >= 0.1:
-                score = 3
-            elif recent_rate >= 0.05:
-                score = 2
-            else:
-                score = 1
-            
-            year_dist = dates.dt.year.value_counts().sort_index()
             self.metrics['year_distribution'] = year_dist.to_dict()
         except Exception as e:
             logger.warning(f"Error analyzing timeliness: {e}")
@@ -103,6 +152,7 @@ class QualityAnalyzer:
         
         return score
     
+    @profiled
     def analyze_accessibility(self):
         """Assess data accessibility"""
         score = 5.0
@@ -113,10 +163,19 @@ class QualityAnalyzer:
         self.metrics['field_count'] = len(self.df.columns)
         return max(1, score)
     
+    @profiled
     def analyze_consistency(self):
         """Assess data consistency"""
         score = 5.0
         self.metrics['dtype_consistency'] = len(self.df.columns)
+        
+        results = RuleSet.for_profile(self.profile).evaluate(self.df)
+        self.metrics['rule_results'] = results
+        checked = sum(r['checked'] for r in results)
+        if checked:
+            violation_rate = sum(r['violations'] for r in results) / checked
+            self.metrics['rule_violation_rate'] = violation_rate
+            score = consistency_score(violation_rate)
         return max(1, score)
     
     def get_summary_report(self):
@@ -124,7 +183,7 @@ class QualityAnalyzer:
         return {
             'total_records': len(self.df),
             'total_fields': len(self.df.columns),
-            'missing_cells': self.df.isna().sum().sum(),
+            'missing_cells': self.plan.missing_cells,
             'completeness_rate': self.metrics.get('overall_completeness', 0),
             'quality_scores': self.scores
         }
@@ -0,0 +1,418 @@
+import io
+import logging
+import math
+from datetime import datetime
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from src.duplicates import ApproximateDuplicateCounter
+from src.profiling import profiled
+from src.quality_analyzer import (QualityAnalyzer, completeness_score, timeliness_score,
+                                  consistency_score)
+from src.rules import RuleSet
+
+logger = logging.getLogger(__name__)
+
+
+class ReservoirSample:
+    """Uniform random sample of at most `size` rows from a stream of chunks
+
+    Every row gets a random key and the rows with the smallest keys are kept
+    (bottom-k sampling), so any prefix of frame() is itself a uniform sample.
+    Rows above the current k-th key are dropped without being copied.
+    """
+
+    def __init__(self, size=100_000, seed=None):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.columns = None
+        self._frames = []
+        self._keys = []
+        self._pending = 0
+        self._threshold = np.inf
+
+    def add(self, chunk):
+        """Offer one chunk's rows to the sample"""
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        elif list(chunk.columns) != self.columns:
+            chunk = chunk.reindex(columns=self.columns)
+
+        keys = self.rng.random(len(chunk))
+        self.rows += len(chunk)
+        keep = keys < self._threshold
+        if not keep.any():
+            return self
+        self._frames.append(chunk[keep])
+        self._keys.append(keys[keep])
+        self._pending += int(keep.sum())
+        if self._pending > 2 * self.size:
+            self._compact()
+        return self
+
+    def _compact(self):
+        keys = np.concatenate(self._keys)
+        frame = pd.concat(self._frames, ignore_index=True)
+        order = np.argsort(keys, kind='stable')[:self.size]
+        self._frames = [frame.iloc[order].reset_index(drop=True)]
+        self._keys = [keys[order]]
+        self._pending = len(order)
+        if len(order) == self.size:
+            self._threshold = keys[order[-1]]
+
+    def finish(self):
+        if self._frames:
+            self._compact()
+        return self
+
+    def frame(self):
+        """The sampled rows, ordered so that frame().iloc[:n] is a uniform sample of n"""
+        if not self._frames:
+            return pd.DataFrame(columns=self.columns)
+        return self.finish()._frames[0]
+
+
+class CsvLineSample:
+    """Uniform random sample of a CSV file's rows, drawn from raw lines
+
+    One pass over the bytes finds line ends with NumPy and keeps the lines
+    with the smallest random keys; only those lines are parsed. Requires a
+    splittable format (no quoted newlines), see src.parallel_csv.sniff_csv.
+    """
+
+    def __init__(self, filepath, fmt, size=100_000, seed=None, block_size=1 << 24):
+        self.filepath = filepath
+        self.fmt = fmt
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.rows = 0
+        self.columns = list(fmt.columns)
+        self._lines = []
+        self._keys = []
+        self._pending = 0
+        self._threshold = np.inf
+        self._frame = None
+
+    def _offer(self, buffer, starts, ends):
+        # Skip blank lines (read_csv does too) so row counts match a full parse
+        lengths = ends - starts
+        blank = (lengths == 0) | ((lengths == 1) & (np.frombuffer(buffer, np.uint8)[starts] == 13))
+        starts, ends = starts[~blank], ends[~blank]
+        keys = self.rng.random(len(starts))
+        self.rows += len(starts)
+        keep = np.flatnonzero(keys < self._threshold)
+        if not len(keep):
+            return
+        self._lines.extend(buffer[start:end] for start, end in
+                           zip(starts[keep].tolist(), (ends[keep] + 1).tolist()))
+        self._keys.append(keys[keep])
+        self._pending += len(keep)
+        if self._pending > 2 * self.size:
+            self._compact()
+
+    def _compact(self):
+        keys = np.concatenate(self._keys) if self._keys else np.empty(0)
+        order = np.argsort(keys, kind='stable')[:self.size]
+        self._lines = [self._lines[i] for i in order]
+        self._keys = [keys[order]]
+        self._pending = len(order)
+        if len(order) == self.size:
+            self._threshold = keys[order[-1]]
+
+    def finish(self):
+        """Scan the file once and parse the sampled lines"""
+        if self._frame is not None:
+            return self
+        carry = b''
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.fmt.data_start)
+            while True:
+                block = f.read(self.block_size)
+                if not block:
+                    break
+                buffer = carry + block
+                ends = np.flatnonzero(np.frombuffer(buffer, np.uint8) == 10)
+                if not len(ends):
+                    carry = buffer
+                    continue
+                starts = np.concatenate(([0], ends[:-1] + 1))
+                self._offer(buffer, starts, ends)
+                carry = buffer[ends[-1] + 1:]
+        if carry.strip():
+            self._offer(carry + b'\n', np.array([0]), np.array([len(carry)]))
+        self._compact()
+
+        if self._lines:
+            self._frame = pd.read_csv(io.BytesIO(b''.join(self._lines)), header=None,
+                                      names=self.columns, encoding_errors='replace',
+                                      **self.fmt.read_kwargs())
+        else:
+            self._frame = pd.DataFrame(columns=self.columns)
+        self._lines = []
+        return self
+
+    def frame(self):
+        """The sampled rows, ordered so that frame().iloc[:n] is a uniform sample of n"""
+        return self.finish()._frame
+
+
+def iter_key_column(filepath, fmt, key_column, chunksize=1_000_000):
+    """Yield single-column DataFrames of a CSV's key column, parsing nothing else"""
+    if key_column not in fmt.columns:
+        return
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError:
+        pa_csv = None
+
+    if pa_csv is not None and fmt.encoding in ('utf-8', 'utf-8-sig'):
+        # Binary keys hash the same as their decoded text and never fail on bad bytes
+        reader = pa_csv.open_csv(
+            filepath,
+            read_options=pa_csv.ReadOptions(block_size=64 << 20),
+            parse_options=pa_csv.ParseOptions(delimiter=fmt.delimiter, quote_char=fmt.quotechar),
+            convert_options=pa_csv.ConvertOptions(include_columns=[key_column],
+                                                  column_types={key_column: pa.binary()},
+                                                  strings_can_be_null=True),
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+        return
+
+    with pd.read_csv(filepath, usecols=[key_column], chunksize=chunksize,
+                     encoding_errors='replace', **fmt.read_kwargs()) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def ratio_interval(y, x, population, z, confidence):
+    """Estimate sum(y)/sum(x) over the population from sampled per-row y and x
+
+    Uses the linearized variance of a ratio estimator with the finite
+    population correction. When the sample shows no variation at all, the
+    half width falls back to the rule-of-three bound for rare events.
+    """
+    y = np.asarray(y, dtype='float64')
+    x = np.asarray(x, dtype='float64')
+    n = len(x)
+    total_x = x.sum()
+    if n == 0 or total_x == 0:
+        return None
+    ratio = y.sum() / total_x
+    fpc = max(0.0, 1 - n / population) if population else 1.0
+    if n > 1:
+        residuals = y - ratio * x
+        variance = fpc * residuals.var(ddof=1) / (n * (total_x / n) ** 2)
+        half = z * math.sqrt(variance)
+    else:
+        half = 1.0
+    if half == 0 and fpc > 0:
+        half = -math.log(1 - confidence) / np.count_nonzero(x)
+    return {'estimate': float(ratio), 'low': float(max(0.0, ratio - half)),
+            'high': float(min(1.0, ratio + half)), 'half_width': float(half)}
+
+
+class QuickScanAnalyzer:
+    """Estimates quality scores with confidence intervals from a streamed sample
+
+    All chunks are streamed once into a reservoir sample. Duplicate keys go
+    into a HyperLogLog counter. The five dimensions then run on a growing
+    prefix of the sample until every interval's half width is at most
+    `precision`, or the reservoir is exhausted.
+    """
+
+    def __init__(self, chunks, precision=0.01, confidence=0.95, initial_size=2_000,
+                 max_size=100_000, key_column='ApplicationNumber', profile=None, seed=None,
+                 sample=None, key_chunks=None):
+        self.chunks = chunks
+        # Optional separate stream of key-column chunks for the duplicate counter
+        self.key_chunks = key_chunks
+        self.precision = precision
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.initial_size = initial_size
+        self.key_column = key_column
+        self.profile = profile
+        self.reservoir = sample if sample is not None else ReservoirSample(max_size, seed=seed)
+        # Duplicates only show up in a sample as pairs, so they are counted over every row
+        self.duplicates = ApproximateDuplicateCounter([key_column],
+                                                      error_rate=max(precision / self.z, 0.002))
+        self.sample = None
+        self.scores = {}
+        self.metrics = {}
+
+    @classmethod
+    def from_csv(cls, filepath, chunksize=250_000, **kwargs):
+        """Build a quick scan over a CSV file
+
+        Rows are sampled from raw lines and only the key column is parsed in
+        full. Files with quoted newlines are streamed through read_csv instead.
+        """
+        from src.data_loader import DataLoader
+        from src.parallel_csv import sniff_csv
+
+        fmt = sniff_csv(filepath)
+        if not fmt.splittable:
+            return cls(DataLoader().iter_csv(filepath, chunksize=chunksize,
+                                             encoding=fmt.encoding), **kwargs)
+        sample = CsvLineSample(filepath, fmt, size=kwargs.get('max_size', 100_000),
+                               seed=kwargs.get('seed'))
+        key_chunks = iter_key_column(filepath, fmt, kwargs.get('key_column', 'ApplicationNumber'))
+        return cls(None, sample=sample, key_chunks=key_chunks, **kwargs)
+
+    @profiled
+    def consume(self):
+        """Stream every pending chunk into the reservoir and duplicate counter"""
+        if self.chunks is not None:
+            for chunk in self.chunks:
+                self.reservoir.add(chunk)
+                if self.key_column in chunk.columns:
+                    self.duplicates.add(chunk)
+            self.chunks = None
+        if self.key_chunks is not None:
+            for chunk in self.key_chunks:
+                self.duplicates.add(chunk)
+            self.key_chunks = None
+        self.reservoir.finish()
+        logger.info(f"Sampled {min(self.reservoir.rows, self.reservoir.size)} "
+                    f"of {self.reservoir.rows} records")
+        return self.reservoir
+
+    @profiled
+    def analyze_all(self):
+        """Estimate all quality scores, growing the sample until the intervals are narrow enough"""
+        logger.info("Running quick-scan quality analysis...")
+        self.consume()
+        sample = self.reservoir.frame()
+        population = self.reservoir.rows
+        if population == 0:
+            self.scores = {'accuracy': 5.0, 'completeness': 1, 'timeliness': 3.0,
+                           'accessibility': 0, 'consistency': 5.0}
+            self.scores['overall'] = np.mean(list(self.scores.values()))
+            return self.scores
+
+        n = min(self.initial_size, len(sample))
+        iterations = 0
+        while True:
+            iterations += 1
+            analyzer = QualityAnalyzer(sample.iloc[:n], profile=self.profile)
+            analyzer.analyze_all()
+            intervals = self._intervals(analyzer, population)
+            widest = max((i['half_width'] for i in intervals.values()), default=0.0)
+            if widest <= self.precision or n >= len(sample):
+                break
+            # Half width shrinks with sqrt(n): jump straight to the size that should suffice
+            needed = math.ceil(n * (widest / self.precision) ** 2 * 1.1)
+            n = min(len(sample), max(needed, 2 * n))
+
+        self.sample = sample.iloc[:n]
+        self._collect(analyzer, intervals, population)
+        self.metrics['quick_scan'] = {
+            'sample_size': n,
+            'rows_scanned': population,
+            'confidence': self.confidence,
+            'precision': self.precision,
+            'max_half_width': widest,
+            'precision_met': widest <= self.precision,
+            'iterations': iterations,
+        }
+        if widest > self.precision:
+            logger.warning(f"Quick scan stopped at the {n}-row reservoir limit with "
+                           f"±{widest:.3f} (requested ±{self.precision:.3f})")
+        logger.info(f"Estimated quality score: {self.scores['overall']:.2f}/5 "
+                    f"from {n} of {population} records")
+        return self.scores
+
+    def _intervals(self, analyzer, population):
+        """Confidence intervals of the sample-based rate metrics"""
+        df = analyzer.df
+        interval = lambda y, x: ratio_interval(y, x, population, self.z, self.confidence)
+        intervals = {}
+
+        non_null = analyzer.plan.row_non_null_counts
+        intervals['overall_completeness'] = interval(non_null, np.full(len(df), len(df.columns)))
+
+        if 'recent_record_rate' in analyzer.metrics:
+            column = analyzer.plan.date_columns[0]
+            dates = analyzer.plan.parse_dates(column).values
+            present = df[column].notna()
+            recent = dates.dt.year >= datetime.now().year - 2
+            intervals['recent_record_rate'] = interval(recent.fillna(False), dates.notna())
+            intervals['date_unparseable_rate'] = interval(present & dates.isna(), present)
+
+        rules = [rule for rule in RuleSet.for_profile(analyzer.profile).rules
+                 if rule.column in df.columns]
+        if rules:
+            violations = sum(rule.violations(df).to_numpy(dtype='int64') for rule in rules)
+            checked = sum(df[rule.column].notna().to_numpy(dtype='int64') for rule in rules)
+            intervals['rule_violation_rate'] = interval(violations, checked)
+        return {name: value for name, value in intervals.items() if value is not None}
+
+    def _collect(self, analyzer, intervals, population):
+        self.scores = dict(analyzer.scores)
+        self.metrics = dict(analyzer.metrics)
+        n = len(analyzer.df)
+
+        self.metrics['record_count'] = population
+        if 'year_distribution' in self.metrics:
+            scale = population / n
+            self.metrics['year_distribution'] = {
+                year: int(round(count * scale))
+                for year, count in self.metrics['year_distribution'].items()
+            }
+
+        score_ranges = {}
+        if 'overall_completeness' in intervals:
+            i = intervals['overall_completeness']
+            score_ranges['completeness'] = [completeness_score(i['low']),
+                                            completeness_score(i['high'])]
+        if 'recent_record_rate' in intervals:
+            i = intervals['recent_record_rate']
+            score_ranges['timeliness'] = [timeliness_score(i['low']), timeliness_score(i['high'])]
+        if 'rule_violation_rate' in intervals:
+            i = intervals['rule_violation_rate']
+            score_ranges['consistency'] = [consistency_score(i['high']),
+                                           consistency_score(i['low'])]
+
+        self.scores['accuracy'] = 5.0
+        self.metrics['accuracy_issues'] = []
+        if self.duplicates.rows:
+            result = self.duplicates.result()
+            self.metrics['duplicates'] = result
+            rate, half = result['duplicate_rate'], self.z * result['duplicate_rate_error']
+            intervals['duplicate_rate'] = {'estimate': rate, 'low': max(0.0, rate - half),
+                                           'high': min(1.0, rate + half), 'half_width': half}
+            # Deduct only when the lower bound clears the threshold, so estimation
+            # error alone cannot cost a duplicate-free feed a point
+            if rate - half > 0.01:
+                self.scores['accuracy'] = 4.0
+                self.metrics['accuracy_issues'].append(f"High duplicate rate: {rate:.1%}")
+            score_ranges['accuracy'] = [4.0 if rate + half > 0.01 else 5.0,
+                                        4.0 if rate - half > 0.01 else 5.0]
+
+        scores = {k: v for k, v in self.scores.items() if k != 'overall'}
+        self.scores['overall'] = np.mean(list(scores.values()))
+        for dimension, score in scores.items():
+            score_ranges.setdefault(dimension, [score, score])
+        score_ranges['overall'] = [np.mean([low for low, _ in score_ranges.values()]),
+                                   np.mean([high for _, high in score_ranges.values()])]
+        self.metrics['confidence_intervals'] = intervals
+        self.metrics['score_ranges'] = score_ranges
+
+    def get_summary_report(self):
+        """Generate summary statistics, with cell counts scaled up from the sample"""
+        columns = len(self.reservoir.columns or [])
+        completeness = self.metrics.get('overall_completeness', 0)
+        return {
+            'total_records': self.reservoir.rows,
+            'total_fields': columns,
+            'missing_cells': int(round((1 - completeness) * self.reservoir.rows * columns)),
+            'completeness_rate': completeness,
+            'quality_scores': self.scores,
+            'sample_size': self.metrics.get('quick_scan', {}).get('sample_size', 0),
+        }
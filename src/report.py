@@ -0,0 +1,199 @@
+import io
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ['overall', 'accuracy', 'completeness', 'timeliness', 'accessibility', 'consistency']
+
+CHART_TITLES = {
+    'plot_temporal_distribution': "Records by Year",
+    'plot_violations_by_type': "Violations by Type",
+    'plot_violations_by_year': "Violations by Year",
+    'plot_geographic_distribution': "Geographic Distribution",
+    'plot_missingness': "Missing Value Rate by Field",
+    'plot_quality_radar': "Quality Radar",
+}
+
+
+def report_data(spec, dpi=150):
+    """Score one dataset and render its charts to PNG bytes; returns a picklable dict"""
+    from src.chart_aggregates import ChartAggregates
+    from src.pipeline import draw_charts, load_dataset
+    from src.quality_analyzer import QualityAnalyzer
+    from src.visualizer import QualityVisualizer
+
+    df = load_dataset(spec)
+    if df.empty:
+        raise ValueError("No data loaded")
+
+    analyzer = QualityAnalyzer(df, profile=spec['profile'], workers=spec.get('column_workers'),
+                               backend=spec.get('backend', 'pandas'),
+                               column_stats=spec.get('column_stats', False))
+    analyzer.analyze_all()
+    summary = analyzer.get_summary_report()
+    aggregates = ChartAggregates.from_analyzer(analyzer, spec['profile'], spec['name'])
+    del df, analyzer
+
+    viz = QualityVisualizer(output_dir=None, dpi=dpi, fmt='png', headless=True)
+    return {
+        'name': spec['name'],
+        'path': spec.get('path'),
+        'summary': summary,
+        'field_missingness': aggregates.field_missingness,
+        'charts': [(method, buffer.getvalue()) for method, buffer in draw_charts(viz, aggregates)],
+    }
+
+
+def _scaled_image(png, max_width, max_height):
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image
+
+    width, height = ImageReader(io.BytesIO(png)).getSize()
+    scale = min(max_width / width, max_height / height)
+    return Image(io.BytesIO(png), width=width * scale, height=height * scale)
+
+
+def _table(rows, col_widths):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(rows, colWidths=col_widths, hAlign='LEFT')
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e3a8a')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f1f5f9')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#94a3b8')),
+    ]))
+    return table
+
+
+def _section(data, doc, styles):
+    """Flowables for one dataset: heading, score table, missingness table, charts"""
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer
+
+    summary = data['summary']
+    scores = summary['quality_scores']
+    story = [
+        # Paragraph text is markup, so names and paths like 'R&D <2024>.csv' are escaped
+        Paragraph(f"{escape(str(data['name']))} Data Quality", styles['Heading1']),
+        Paragraph(f"Source: {escape(str(data.get('path') or 'sample data'))}<br/>"
+                  f"{summary['total_records']:,} records, {summary['total_fields']} fields, "
+                  f"{summary['completeness_rate']:.1%} complete", styles['Normal']),
+        Spacer(1, 0.2 * inch),
+        Paragraph("Quality Scores", styles['Heading2']),
+        _table([['Dimension', 'Score (of 5)']] +
+               [[dim.capitalize(), f"{float(scores[dim]):.2f}"] for dim in DIMENSIONS
+                if dim in scores], [2.5 * inch, 1.2 * inch]),
+    ]
+
+    missing = sorted(data['field_missingness'].items(), key=lambda item: item[1], reverse=True)
+    if missing:
+        story += [
+            Spacer(1, 0.2 * inch),
+            Paragraph("Missing Values by Field", styles['Heading2']),
+            _table([['Field', 'Missing (%)']] +
+                   [[field, f"{float(rate):.2f}"] for field, rate in missing],
+                   [2.5 * inch, 1.2 * inch]),
+        ]
+
+    for method, png in data['charts']:
+        story += [
+            Spacer(1, 0.2 * inch),
+            Paragraph(CHART_TITLES.get(method, method), styles['Heading2']),
+            _scaled_image(png, doc.width, doc.height * 0.45),
+        ]
+    return story
+
+
+def build_pdf(reports, out):
+    """Write one PDF with a section per report_data() dict; out is a path or binary file"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, SimpleDocTemplate
+
+    if isinstance(out, (str, os.PathLike)):
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+    doc = SimpleDocTemplate(out, pagesize=letter, title="YSSL Data Quality Report")
+    styles = getSampleStyleSheet()
+    story = []
+    for i, data in enumerate(reports):
+        if i:
+            story.append(PageBreak())
+        story += _section(data, doc, styles)
+    doc.build(story)
+    return out
+
+
+def report_dataset(spec, dpi=150, keep_charts=False):
+    """Build one dataset's PDF (at spec['report']), capturing any failure"""
+    started = time.time()
+    result = {'name': spec['name'], 'path': spec.get('path'), 'status': 'ok'}
+    try:
+        data = report_data(spec, dpi)
+        result['summary'] = data['summary']
+        if keep_charts:
+            # Report packs are assembled by the caller from the returned data
+            result['data'] = data
+        else:
+            result['report'] = build_pdf([data], spec['report'])
+    except Exception as e:
+        logger.error(f"Report for {spec['name']} failed: {e}")
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+        result['traceback'] = traceback.format_exc()
+    result['seconds'] = round(time.time() - started, 3)
+    return result
+
+
+def build_reports(datasets, workers=None, output_dir=None, pack_path=None, dpi=150):
+    """Build PDF reports for many datasets across a process pool
+
+    Charts never touch the disk: each worker renders them into memory and
+    embeds them directly. Without pack_path every dataset gets its own
+    <name>_report.pdf (in output_dir, or the dataset's output_dir). With
+    pack_path the workers return chart bytes and one combined PDF is written.
+    Results keep manifest order.
+    """
+    specs = []
+    for spec in datasets:
+        spec = dict(spec)
+        spec.setdefault('report', os.path.join(output_dir or spec['output_dir'],
+                                               f"{spec['name']}_report.pdf"))
+        specs.append(spec)
+
+    keep_charts = pack_path is not None
+    results = [None] * len(specs)
+    if workers == 1:
+        for i, spec in enumerate(specs):
+            results[i] = report_dataset(spec, dpi, keep_charts)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(report_dataset, spec, dpi, keep_charts): i
+                       for i, spec in enumerate(specs)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. killed for memory)
+                    results[i] = {'name': specs[i]['name'], 'path': specs[i].get('path'),
+                                  'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+                logger.info(f"[{results[i]['status']}] {specs[i]['name']}")
+
+    if keep_charts:
+        packed = [result.pop('data') for result in results if 'data' in result]
+        if packed:
+            build_pdf(packed, pack_path)
+            for result in results:
+                if result['status'] == 'ok':
+                    result['report'] = pack_path
+    return results
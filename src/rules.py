@@ -0,0 +1,125 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Range bound replaced by the current year each time a rule is evaluated
+CURRENT_YEAR = 'current_year'
+
+# Declarative consistency rules per dataset profile. Each rule checks one column
+# with exactly one of: pattern (full regex match), allowed (enumeration) or
+# min/max (numeric range). Missing values are left to the completeness check.
+PROFILES = {
+    'cipo': [
+        {'name': 'application_number_format', 'column': 'ApplicationNumber',
+         'pattern': r'CA\d{7}'},
+        {'name': 'nice_class', 'column': 'Classification',
+         'pattern': r'Nice Class (?:[1-9]|[1-3]\d|4[0-5])'},
+        {'name': 'current_status', 'column': 'CurrentStatus',
+         'allowed': ['Registered', 'Pending', 'Abandoned', 'Dead', 'Formalized', 'Searched',
+                     'Approved', 'Advertised', 'Allowed', 'Opposed', 'Expunged', 'Cancelled',
+                     'Expired', 'Withdrawn']},
+        {'name': 'mark_category', 'column': 'MarkCategory',
+         'allowed': ['Word', 'Design', 'Combined']},
+        {'name': 'mark_feature', 'column': 'MarkFeature',
+         'allowed': ['Standard', 'Color', 'Colour', 'Sound', 'Three-dimensional', 'Hologram']},
+    ],
+    'ontario': [
+        {'name': 'violation_type', 'column': 'ViolationType',
+         'allowed': ['Wage Theft', 'Overtime', 'Termination', 'Vacation', 'Holiday', 'Other']},
+        {'name': 'year_range', 'column': 'Year', 'min': 2000, 'max': CURRENT_YEAR},
+        {'name': 'amount_non_negative', 'column': 'Amount', 'min': 0},
+        {'name': 'status', 'column': 'Status',
+         'allowed': ['Resolved', 'Pending', 'In Progress']},
+    ],
+}
+
+
+def detect_profile(columns):
+    """Guess the rule profile from a dataset's columns"""
+    if 'ApplicationNumber' in columns:
+        return 'cipo'
+    if 'ViolationType' in columns:
+        return 'ontario'
+    return None
+
+
+def _on_categories(series, check):
+    """Run a value check once per category instead of once per row"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        per_category = np.asarray(check(pd.Series(series.cat.categories)), dtype=bool)
+        codes = series.cat.codes.to_numpy()
+        return pd.Series(np.where(codes >= 0, per_category[codes], False), index=series.index)
+    return check(series)
+
+
+def _bound(value):
+    """A range bound, with CURRENT_YEAR resolved at evaluation time"""
+    return datetime.now().year if value == CURRENT_YEAR else value
+
+
+class Rule:
+    """One compiled, vectorized column check"""
+
+    def __init__(self, name, column, pattern=None, allowed=None, min=None, max=None):
+        self.name = name
+        self.column = column
+        if pattern is not None:
+            self.kind = 'pattern'
+            self._check = lambda s: ~s.astype('string').str.fullmatch(pattern).fillna(False)
+        elif allowed is not None:
+            self.kind = 'allowed'
+            allowed = frozenset(allowed)
+            self._check = lambda s: ~s.isin(allowed)
+        elif min is not None or max is not None:
+            self.kind = 'range'
+            self._check = self._range_check(min, max)
+        else:
+            raise ValueError(f"Rule {name} needs a pattern, allowed values or a range")
+
+    @staticmethod
+    def _range_check(low, high):
+        def check(series):
+            values = pd.to_numeric(series, errors='coerce')
+            bad = values.isna()
+            if low is not None:
+                bad |= values < _bound(low)
+            if high is not None:
+                bad |= values > _bound(high)
+            return bad
+        return check
+
+    def violations(self, df):
+        """Boolean mask of non-missing values that break the rule"""
+        series = df[self.column]
+        return series.notna() & _on_categories(series, self._check)
+
+
+class RuleSet:
+    """Evaluates a list of rules against DataFrames"""
+
+    def __init__(self, rules):
+        self.rules = [rule if isinstance(rule, Rule) else Rule(**rule) for rule in rules]
+
+    @classmethod
+    def for_profile(cls, profile):
+        return cls(PROFILES[profile]) if profile in PROFILES else cls([])
+
+    def evaluate(self, df):
+        """Per-rule violation counts, checked (non-missing) values and seconds spent"""
+        results = []
+        for rule in self.rules:
+            if rule.column not in df.columns:
+                continue
+            started = time.perf_counter()
+            violations = rule.violations(df)
+            results.append({
+                'rule': rule.name,
+                'column': rule.column,
+                'kind': rule.kind,
+                'violations': int(violations.sum()),
+                'checked': int(df[rule.column].notna().sum()),
+                'seconds': time.perf_counter() - started,
+            })
+        return results
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import logging
+import numbers
+import os
+import sqlite3
+import time
+
+from src.dataset_cache import file_content_hash
+from src.pipeline import _to_builtin
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    dataset TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_dataset ON runs (dataset, created_at);
+CREATE INDEX IF NOT EXISTS runs_fingerprint ON runs (fingerprint, profile);
+
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    dimension TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (run_id, dimension)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS field_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    field TEXT NOT NULL,
+    missing_pct REAL NOT NULL,
+    PRIMARY KEY (run_id, field)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS field_metrics_field ON field_metrics (field, run_id);
+
+CREATE TABLE IF NOT EXISTS year_counts (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    year INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, year)
+) WITHOUT ROWID;
+"""
+
+# The newest runs of one dataset, numbered 1 (latest) upwards
+RECENT_RUNS = """
+recent AS (
+    SELECT id, created_at, ROW_NUMBER() OVER (ORDER BY created_at DESC, id DESC) AS rn
+    FROM runs WHERE dataset = :dataset
+)"""
+
+# Result keys kept in the stored run; stage profiles and tracebacks are dropped
+STORED_KEYS = ('summary', 'metrics', 'charts', 'aggregates', 'chart_data')
+
+
+def spec_fingerprint(spec):
+    """Content fingerprint of the data a manifest-style spec describes"""
+    loader = spec.get('loader', 'csv')
+    if loader in ('sample', 'sample_ontario'):
+        # Sample data is seeded, so the spec itself identifies the content
+        return f"{loader}:{spec.get('n_records', 1000)}"
+    if loader == 'files':
+        from src.multi_file import resolve_sources
+
+        digest = hashlib.blake2b(digest_size=16)
+        for path in resolve_sources(spec['path']):
+            digest.update(f"{os.path.basename(path)}:{file_content_hash(path)}\n".encode())
+        return digest.hexdigest()
+    return file_content_hash(spec['path'])
+
+
+class RunHistory:
+    """SQLite store of past quality runs for trend, regression and drift queries
+
+    Each run keeps its scores, scalar metrics, per-field missingness and year
+    distribution in indexed tables, keyed by dataset name and content
+    fingerprint. lookup() finds a run of identical data so it need not be
+    scored again. One instance per thread; separate processes may share
+    the file (WAL mode).
+    """
+
+    def __init__(self, path='outputs/run_history.sqlite'):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _insert(self, run):
+        scores = run.get('scores') or run['summary']['quality_scores']
+        metrics = run.get('metrics') or {}
+        result = {key: run[key] for key in STORED_KEYS if key in run}
+        cursor = self.conn.execute(
+            'INSERT INTO runs (dataset, profile, fingerprint, created_at, result) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (run['dataset'], run['profile'], run['fingerprint'], run.get('created_at', time.time()),
+             json.dumps(result, default=_to_builtin)))
+        run_id = cursor.lastrowid
+        rows = {
+            'scores': [(run_id, dim, float(score)) for dim, score in scores.items()],
+            'run_metrics': [(run_id, name, float(value)) for name, value in metrics.items()
+                            if isinstance(value, numbers.Number) and not isinstance(value, bool)],
+            'field_metrics': [(run_id, field, float(pct)) for field, pct in
+                              metrics.get('field_missingness', {}).items()],
+            'year_counts': [(run_id, int(year), int(count)) for year, count in
+                            metrics.get('year_distribution', {}).items()],
+        }
+        return run_id, rows
+
+    def record_many(self, runs):
+        """Insert runs and their per-field rows in one transaction; returns the run ids
+
+        Each run is a dict with dataset, profile, fingerprint, summary (or
+        scores), metrics and optionally charts, aggregates, chart_data (a
+        ChartAggregates.to_dict() snapshot to redraw the charts from) and
+        created_at.
+        """
+        ids = []
+        pending = {'scores': [], 'run_metrics': [], 'field_metrics': [], 'year_counts': []}
+        with self.conn:
+            for run in runs:
+                run_id, rows = self._insert(run)
+                ids.append(run_id)
+                for table, values in rows.items():
+                    pending[table].extend(values)
+            self.conn.executemany('INSERT INTO scores VALUES (?, ?, ?)', pending['scores'])
+            self.conn.executemany('INSERT INTO run_metrics VALUES (?, ?, ?)', pending['run_metrics'])
+            self.conn.executemany('INSERT INTO field_metrics VALUES (?, ?, ?)',
+                                  pending['field_metrics'])
+            self.conn.executemany('INSERT INTO year_counts VALUES (?, ?, ?)', pending['year_counts'])
+        if ids:
+            logger.info(f"Recorded {len(ids)} runs in {self.path}")
+        return ids
+
+    def record(self, dataset, profile, fingerprint, result, created_at=None):
+        """Insert one run result (as returned by run_dataset); returns its id"""
+        run = dict(result, dataset=dataset, profile=profile, fingerprint=fingerprint)
+        if created_at is not None:
+            run['created_at'] = created_at
+        return self.record_many([run])[0]
+
+    def lookup(self, fingerprint, profile):
+        """Latest run of data with this fingerprint under a profile, or None"""
+        row = self.conn.execute(
+            'SELECT id, dataset, created_at, result FROM runs '
+            'WHERE fingerprint = ? AND profile = ? ORDER BY created_at DESC, id DESC LIMIT 1',
+            (fingerprint, profile)).fetchone()
+        if row is None:
+            return None
+        return dict(json.loads(row['result']), run_id=row['id'], dataset=row['dataset'],
+                    created_at=row['created_at'])
+
+    def runs(self, dataset, last=10):
+        """(run id, created_at, fingerprint) of a dataset's most recent runs, oldest first"""
+        rows = self.conn.execute(
+            'SELECT id, created_at, fingerprint FROM runs WHERE dataset = ? '
+            'ORDER BY created_at DESC, id DESC LIMIT ?', (dataset, last)).fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    def trend(self, dataset, dimension='overall', last=10):
+        """(run id, created_at, score) of one dimension over the last runs, oldest first"""
+        rows = self.conn.execute(
+            'SELECT r.id, r.created_at, s.score FROM runs r '
+            'JOIN scores s ON s.run_id = r.id AND s.dimension = ? '
+            'WHERE r.dataset = ? ORDER BY r.created_at DESC, r.id DESC LIMIT ?',
+            (dimension, dataset, last)).fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    def field_trend(self, dataset, field, last=10):
+        """(run id, created_at, missing %) of one field over the last runs, oldest first"""
+        rows = self.conn.execute(
+            'SELECT r.id, r.created_at, f.missing_pct FROM runs r '
+            'JOIN field_metrics f ON f.run_id = r.id AND f.field = ? '
+            'WHERE r.dataset = ? ORDER BY r.created_at DESC, r.id DESC LIMIT ?',
+            (field, dataset, last)).fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    def regressions(self, dataset, threshold=0.2):
+        """Dimensions whose score fell by more than threshold since the previous run"""
+        rows = self.conn.execute(f"""
+            WITH {RECENT_RUNS}
+            SELECT cur.dimension, prev.score AS previous, cur.score AS current
+            FROM recent rc
+            JOIN scores cur ON cur.run_id = rc.id
+            JOIN recent rp ON rp.rn = 2
+            JOIN scores prev ON prev.run_id = rp.id AND prev.dimension = cur.dimension
+            WHERE rc.rn = 1 AND prev.score - cur.score > :threshold
+            ORDER BY prev.score - cur.score DESC
+            """, {'dataset': dataset, 'threshold': threshold}).fetchall()
+        return [dict(row, change=row['current'] - row['previous']) for row in rows]
+
+    def completeness_drift(self, dataset, last=5, threshold=5.0):
+        """Fields whose missing % rose by more than threshold points across the last runs
+
+        Compares the oldest and newest of the last N runs; each row also
+        carries the worst value seen in between.
+        """
+        rows = self.conn.execute(f"""
+            WITH {RECENT_RUNS},
+            span AS (SELECT id, rn FROM recent WHERE rn <= :last),
+            bounds AS (SELECT MIN(rn) AS newest, MAX(rn) AS oldest FROM span)
+            SELECT f.field,
+                   MAX(CASE WHEN s.rn = b.oldest THEN f.missing_pct END) AS first,
+                   MAX(CASE WHEN s.rn = b.newest THEN f.missing_pct END) AS latest,
+                   MAX(f.missing_pct) AS worst,
+                   COUNT(*) AS runs
+            FROM field_metrics f
+            JOIN span s ON s.id = f.run_id
+            CROSS JOIN bounds b
+            GROUP BY f.field
+            HAVING latest - first > :threshold
+            ORDER BY latest - first DESC
+            """, {'dataset': dataset, 'last': last, 'threshold': threshold}).fetchall()
+        return [dict(row, change=row['latest'] - row['first']) for row in rows]
+
+    def year_drift(self, dataset):
+        """Total variation distance between the year shares of the last two runs (0 to 1)"""
+        rows = self.conn.execute(f"""
+            WITH {RECENT_RUNS}
+            SELECT rc.rn, y.year, y.count FROM recent rc
+            JOIN year_counts y ON y.run_id = rc.id
+            WHERE rc.rn <= 2
+            """, {'dataset': dataset}).fetchall()
+        shares = {1: {}, 2: {}}
+        for row in rows:
+            shares[row['rn']][row['year']] = row['count']
+        if not shares[1] or not shares[2]:
+            return None
+        totals = {rn: sum(counts.values()) for rn, counts in shares.items()}
+        years = set(shares[1]) | set(shares[2])
+        return 0.5 * sum(abs(shares[1].get(year, 0) / totals[1] - shares[2].get(year, 0) / totals[2])
+                         for year in years)
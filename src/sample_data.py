@@ -0,0 +1,149 @@
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Filing-year buckets for CIPO samples: (probability, first year, last year exclusive)
+FILING_YEAR_BUCKETS = [
+    (0.70, 1980, 2000),
+    (0.15, 2000, 2010),
+    (0.10, 2010, 2020),
+    (0.05, 2020, 2026),
+]
+
+NICE_CLASSES = [f'Nice Class {i}' for i in range(1, 46)]
+
+
+def _choice(rng, values, n, p=None):
+    """Vectorized categorical draw that keeps None values as missing"""
+    values = np.array(values, dtype=object)
+    return values[rng.choice(len(values), n, p=p)]
+
+
+def _prefixed(prefix, numbers):
+    """Vectorized f'{prefix}{number}' strings"""
+    if hasattr(np, 'strings'):
+        # NumPy 2 variable-width strings avoid fixed-width unicode buffers
+        return np.strings.add(prefix, numbers.astype(np.dtypes.StringDType())).astype(object)
+    return np.char.add(prefix, numbers.astype(str)).astype(object)
+
+
+def _filing_dates(rng, n):
+    probs = np.array([bucket[0] for bucket in FILING_YEAR_BUCKETS])
+    lows = np.array([bucket[1] for bucket in FILING_YEAR_BUCKETS])
+    highs = np.array([bucket[2] for bucket in FILING_YEAR_BUCKETS])
+
+    bucket = rng.choice(len(probs), n, p=probs)
+    years = lows[bucket] + (rng.random(n) * (highs[bucket] - lows[bucket])).astype(np.int64)
+    months = rng.integers(1, 13, n)
+    days = rng.integers(1, 28, n)
+
+    # Index into a table of every possible date string instead of formatting n dates
+    first_year = lows.min()
+    table = _date_strings(first_year, highs.max())
+    return table[((years - first_year) * 12 + (months - 1)) * 27 + (days - 1)]
+
+
+def _date_strings(first_year, last_year):
+    """Object array of 'YYYY-MM-DD' for every year, month and day 1-27"""
+    years = np.repeat(np.arange(first_year, last_year), 12 * 27)
+    months = np.tile(np.repeat(np.arange(12), 27), last_year - first_year)
+    days = np.tile(np.arange(27), 12 * (last_year - first_year))
+    dates = (
+        (years - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+        + months.astype('timedelta64[M]')
+    ).astype('datetime64[D]') + days.astype('timedelta64[D]')
+    return dates.astype(str).astype(object)
+
+
+def generate_cipo_chunk(rng, start, n):
+    """Build n CIPO-like trademark rows numbered from start"""
+    index = np.arange(start, start + n)
+    descriptions = np.full(n, None, dtype=object)
+    has_description = rng.random(n) > 0.82
+    descriptions[has_description] = _prefixed('Trademark ', index[has_description])
+
+    return pd.DataFrame({
+        'ApplicationNumber': _prefixed('CA', 1000000 + index),
+        'FilingDate': _filing_dates(rng, n),
+        'MarkCategory': _choice(rng, ['Word', 'Design', 'Combined', None], n,
+                                p=[0.15, 0.03, 0.02, 0.80]),
+        'MarkFeature': _choice(rng, ['Standard', 'Color', None], n, p=[0.10, 0.05, 0.85]),
+        'MarkDescription': descriptions,
+        'ImageFile': _choice(rng, ['image.png', None], n, p=[0.15, 0.85]),
+        'CurrentStatus': _choice(rng, ['Registered', 'Pending', 'Abandoned', 'Dead'], n),
+        'Classification': _choice(rng, NICE_CLASSES, n),
+    })
+
+
+def generate_ontario_chunk(rng, start, n):
+    """Build n Ontario employment-violation rows"""
+    return pd.DataFrame({
+        'ViolationType': _choice(
+            rng, ['Wage Theft', 'Overtime', 'Termination', 'Vacation', 'Holiday', 'Other'], n,
+            p=[0.35, 0.17, 0.27, 0.13, 0.05, 0.03]
+        ),
+        'Year': rng.integers(2012, 2025, n),
+        'City': _choice(
+            rng, ['Toronto', 'Ottawa', 'Hamilton', 'London', 'Mississauga', 'Other'], n,
+            p=[0.35, 0.15, 0.12, 0.08, 0.08, 0.22]
+        ),
+        'Amount': rng.uniform(500, 50000, n).round(2),
+        'Status': _choice(rng, ['Resolved', 'Pending', 'In Progress'], n, p=[0.7, 0.2, 0.1]),
+    })
+
+
+SCHEMAS = {
+    'cipo': generate_cipo_chunk,
+    'ontario': generate_ontario_chunk,
+}
+
+
+def iter_sample_chunks(schema='cipo', n_records=1000, chunk_size=1_000_000, seed=42):
+    """Yield synthetic rows in chunks; chunk i draws from default_rng([seed, i])
+
+    Output is reproducible for a given (seed, chunk_size) regardless of how
+    much of it the caller consumes.
+    """
+    generate = SCHEMAS[schema]
+    for i, start in enumerate(range(0, n_records, chunk_size)):
+        rng = np.random.default_rng([seed, i])
+        yield generate(rng, start, min(chunk_size, n_records - start))
+
+
+def write_sample_data(path, schema='cipo', n_records=1000, chunk_size=1_000_000, seed=42):
+    """Stream synthetic rows to .csv, .parquet or .arrow/.feather without holding them all"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in ('.csv', '.parquet', '.arrow', '.feather'):
+        raise ValueError(f"Unsupported sample data format: {ext}")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    logger.info(f"Writing {n_records} sample {schema} records to {path}")
+
+    writer = None
+    try:
+        for i, chunk in enumerate(iter_sample_chunks(schema, n_records, chunk_size, seed)):
+            if ext == '.csv':
+                chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+                continue
+
+            import pyarrow as pa
+            if writer is None:
+                # Fix the schema up front so an all-missing column in one chunk stays a string
+                arrow_schema = pa.schema([
+                    (col, pa.from_numpy_dtype(dtype) if dtype.kind in 'iufb' else pa.string())
+                    for col, dtype in chunk.dtypes.items()
+                ])
+                if ext == '.parquet':
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, arrow_schema)
+                else:
+                    writer = pa.ipc.new_file(path, arrow_schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=arrow_schema,
+                                                    preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request as urllib_request
+
+from src.dataset_cache import file_content_hash
+from src.pipeline import LOADERS, PROFILES, _to_builtin, dataset_name, run_dataset
+
+logger = logging.getLogger(__name__)
+
+# Loaders that generate data instead of reading a file
+SAMPLE_LOADERS = ('sample', 'sample_ontario')
+
+
+def _warm_worker():
+    """Import the heavy modules once per worker so requests skip the cold start"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot  # noqa: F401
+    import src.data_loader  # noqa: F401
+    import src.quality_analyzer  # noqa: F401
+    import src.visualizer  # noqa: F401
+
+
+def _ping():
+    return os.getpid()
+
+
+class Fingerprinter:
+    """Content hashes of dataset files, re-hashed only when size or mtime changes"""
+
+    def __init__(self):
+        self._known = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, filepath):
+        path = os.path.abspath(filepath)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        with self._lock:
+            known = self._known.get(path)
+        if known is not None and known[0] == signature:
+            return known[1]
+        digest = file_content_hash(path)
+        with self._lock:
+            self._known[path] = (signature, digest)
+        return digest
+
+
+class ResultCache:
+    """Thread-safe LRU of scoring results keyed by dataset fingerprint and options"""
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            # Charts deleted since the run make the entry stale
+            if any(not os.path.exists(path) for path in result.get('charts', [])):
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+class ScoringService:
+    """Scores datasets on warm worker processes, caching results by content fingerprint
+
+    Requests are manifest-style dataset specs ({path, loader, profile, ...}).
+    Identical requests for an unchanged file are answered from the cache;
+    concurrent identical requests share one run.
+    """
+
+    def __init__(self, workers=2, cache_size=128, plots=True, output_dir='outputs/service'):
+        self.workers = workers
+        self.plots = plots
+        self.output_dir = output_dir
+        self.cache = ResultCache(cache_size)
+        self.fingerprint = Fingerprinter()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def start(self):
+        """Spawn and warm the worker processes"""
+        started = time.perf_counter()
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+            pool = self._pool
+        pids = {future.result() for future in [pool.submit(_ping) for _ in range(self.workers)]}
+        logger.info(f"Warmed {len(pids)} workers in {time.perf_counter() - started:.2f}s")
+        return self
+
+    def close(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def _spec(self, request):
+        """Validate a request and fill in manifest defaults
+
+        Charts always go under the service's output_dir: requests may not set
+        their own, and the name becomes a plain file name.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Request body must be a JSON object")
+        if 'output_dir' in request:
+            raise ValueError("Requests cannot set 'output_dir'; charts go under the "
+                             "service's output directory")
+        spec = dict(request)
+        spec.setdefault('loader', 'csv')
+        if spec['loader'] not in LOADERS:
+            raise ValueError(f"Unknown loader '{spec['loader']}'")
+        if spec['loader'] not in SAMPLE_LOADERS:
+            if not spec.get('path'):
+                raise ValueError("Request needs a 'path'")
+            if spec['loader'] == 'files':
+                self._sources(spec)
+            elif not os.path.isfile(spec['path']):
+                raise FileNotFoundError(f"No such file: {spec['path']}")
+        spec.setdefault('profile', 'ontario' if 'ontario' in spec['loader'] else 'cipo')
+        if spec['profile'] not in PROFILES:
+            raise ValueError(f"Unknown profile '{spec['profile']}'")
+        spec.setdefault('name', dataset_name(spec.get('path'), spec['loader']))
+        spec['name'] = re.sub(r'[^\w.-]', '_', str(spec['name']))
+        spec.setdefault('plots', self.plots)
+        return spec
+
+    @staticmethod
+    def _sources(spec):
+        """Files a 'files' spec's directory, glob or list expands to"""
+        from src.multi_file import resolve_sources
+
+        paths = resolve_sources(spec['path'])
+        if not paths:
+            raise FileNotFoundError(f"No CSV or XLSX files found for {spec['path']}")
+        return paths
+
+    def _cache_key(self, spec):
+        if spec['loader'] in SAMPLE_LOADERS:
+            # Sample data is seeded, so the spec itself identifies the content
+            fingerprint = f"{spec['loader']}:{spec.get('n_records', 1000)}"
+        elif spec['loader'] == 'files':
+            # Same combination as run_history.spec_fingerprint, from cached file hashes
+            digest = hashlib.blake2b(digest_size=16)
+            for path in self._sources(spec):
+                digest.update(f"{os.path.basename(path)}:{self.fingerprint(path)}\n".encode())
+            fingerprint = digest.hexdigest()
+        else:
+            fingerprint = self.fingerprint(spec['path'])
+        options = {k: v for k, v in spec.items() if k not in ('path', 'name')}
+        return fingerprint, json.dumps(options, sort_keys=True, default=str)
+
+    def _output_dir(self, spec, key):
+        """Default chart directory, distinct for every data content and option set"""
+        suffix = hashlib.blake2b('\n'.join(key).encode(), digest_size=6).hexdigest()
+        return os.path.join(self.output_dir, f"{spec['name']}-{suffix}")
+
+    def _run(self, spec):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+            pool = self._pool
+        try:
+            return pool.submit(run_dataset, spec, spec['plots']).result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory); replace the pool for later requests
+            with self._pool_lock:
+                if self._pool is pool:
+                    self._pool = None
+            return {'name': spec['name'], 'path': spec.get('path'), 'status': 'error',
+                    'error': f"{type(e).__name__}: {e}"}
+
+    def score(self, request):
+        """Score one dataset request; returns the run result plus fingerprint and cache flag"""
+        started = time.perf_counter()
+        spec = self._spec(request)
+        key = self._cache_key(spec)
+        spec.setdefault('output_dir', self._output_dir(spec, key))
+
+        result = self.cache.get(key)
+        if result is not None:
+            return dict(result, cached=True, seconds=round(time.perf_counter() - started, 6))
+
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if not owner:
+            event.wait()
+            result = self.cache.get(key)
+            if result is not None:
+                return dict(result, cached=True, seconds=round(time.perf_counter() - started, 6))
+
+        try:
+            result = self._run(spec)
+            result['fingerprint'] = key[0]
+            if result['status'] == 'ok':
+                self.cache.put(key, result)
+        finally:
+            if owner:
+                with self._lock:
+                    del self._inflight[key]
+                event.set()
+        return dict(result, cached=False)
+
+    def health(self):
+        return {'status': 'ok', 'workers': self.workers, 'cache': self.cache.stats()}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """JSON endpoints: GET /health, POST /score, DELETE /cache"""
+
+    service = None
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=_to_builtin).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, self.service.health())
+        else:
+            self._send(404, {'error': f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/score':
+            self._send(404, {'error': f"Unknown endpoint {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            result = self.service.score(request)
+        except (ValueError, FileNotFoundError) as e:
+            self._send(400, {'status': 'error', 'error': str(e)})
+            return
+        self._send(200 if result['status'] == 'ok' else 500, result)
+
+    def do_DELETE(self):
+        if self.path == '/cache':
+            self.service.cache.clear()
+            self._send(200, self.service.cache.stats())
+        else:
+            self._send(404, {'error': f"Unknown endpoint {self.path}"})
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+
+def make_server(service, host='127.0.0.1', port=8765):
+    """HTTP server bound to service; port=0 picks a free port (see server.server_port)"""
+    handler = type('ScoringHandler', (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+class ScoringClient:
+    """Minimal client for a running scoring service"""
+
+    def __init__(self, url='http://127.0.0.1:8765', timeout=600):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _call(self, method, endpoint, payload=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        req = urllib_request.Request(f'{self.url}{endpoint}', data=data, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib_request.urlopen(req, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib_request.HTTPError as e:
+            # Error responses still carry a JSON body describing the failure
+            return json.loads(e.read())
+
+    def score(self, path=None, **spec):
+        if path is not None:
+            spec['path'] = path
+        return self._call('POST', '/score', spec)
+
+    def health(self):
+        return self._call('GET', '/health')
+
+    def clear_cache(self):
+        return self._call('DELETE', '/cache')
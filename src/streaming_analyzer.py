@@ -0,0 +1,364 @@
+import pandas as pd
+import numpy as np
+from collections import Counter
+from datetime import datetime
+import logging
+
+from src.date_parsing import detect_date_columns, infer_date_format, parse_dates
+from src.duplicates import KeyHashSet, key_hashes, key_text
+from src.profiling import profiled
+from src.quality_analyzer import completeness_score, timeliness_score, consistency_score
+from src.rules import RuleSet, detect_profile
+
+logger = logging.getLogger(__name__)
+
+# Standard errors below an approximate duplicate rate taken as its lower bound (95%)
+DUPLICATE_Z = 1.96
+
+
+class QualityState:
+    """Mergeable partial aggregates behind the quality dimensions
+
+    Every aggregate is a fixed-size count except the set of keys seen so
+    far, which is a KeyHashSet spilled to key_dir (a temporary directory by
+    default), so memory stays bounded by the chunk size.
+    """
+
+    def __init__(self, key_column='ApplicationNumber', track_keys=True, profile=None,
+                 key_dir=None, key_segments=()):
+        self.key_column = key_column
+        self.track_keys = track_keys
+        self.profile = profile
+        self.rule_results = {}
+        self.columns = None
+        # Columns absent from the first chunks: {column: rows read before it appeared}
+        self.late_columns = {}
+        self.date_column = None
+        self.date_format = None
+        self.row_count = 0
+        self.null_counts = {}
+        self.duplicate_count = 0
+        self.seen_keys = KeyHashSet(key_dir, key_segments)
+        self.null_key_count = 0
+        self.date_values = 0
+        self.parsed_dates = 0
+        self.year_counts = Counter()
+        self.timeliness_error = None
+
+    def update(self, chunk):
+        """Fold one DataFrame chunk into the running aggregates"""
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.null_counts = {col: 0 for col in self.columns}
+            date_cols = detect_date_columns(chunk)
+            self.date_column = date_cols[0] if date_cols else None
+            if self.date_column is not None:
+                # Infer the format once so every chunk is parsed the same way
+                self.date_format, _ = infer_date_format(chunk[self.date_column])
+            self.profile = self.profile or detect_profile(self.columns)
+        elif list(chunk.columns) != self.columns:
+            self._add_columns([col for col in chunk.columns if col not in self.null_counts],
+                              self.row_count)
+            # Columns missing from a later chunk count as missing cells
+            chunk = chunk.reindex(columns=self.columns)
+
+        self.row_count += len(chunk)
+        for col, count in chunk.isna().sum().items():
+            self.null_counts[col] += int(count)
+
+        if self.track_keys and self.key_column in self.columns:
+            self._update_keys(chunk[self.key_column])
+
+        for result in RuleSet.for_profile(self.profile).evaluate(chunk):
+            self._add_rule_result(result)
+
+        if self.date_column is not None and self.timeliness_error is None:
+            try:
+                parsed = parse_dates(chunk[self.date_column], self.date_format, infer=False)
+                dates = parsed.dropna()
+                self.date_values += parsed.non_null
+                self.parsed_dates += len(dates)
+                self.year_counts.update(dates.dt.year.value_counts().to_dict())
+            except Exception as e:
+                logger.warning(f"Error parsing dates in chunk: {e}")
+                self.timeliness_error = str(e)
+        return self
+
+    def _add_columns(self, columns, rows):
+        """Add columns first seen after rows rows; those earlier rows count as missing"""
+        if not columns:
+            return
+        logger.warning(f"Columns first seen after {rows} rows: {', '.join(map(str, columns))}; "
+                       f"counting them as missing in the earlier rows")
+        for col in columns:
+            self.columns.append(col)
+            self.null_counts[col] = rows
+            self.late_columns[col] = rows
+
+    def _add_rule_result(self, result):
+        total = self.rule_results.setdefault(result['rule'], dict(result, violations=0,
+                                                                  checked=0, seconds=0.0))
+        for field in ('violations', 'checked', 'seconds'):
+            total[field] += result[field]
+
+    def _update_keys(self, keys):
+        nulls = keys.isna()
+        null_count = int(nulls.sum())
+        if null_count:
+            # Like Series.duplicated(), every missing key after the first is a duplicate
+            self.duplicate_count += null_count - (0 if self.null_key_count else 1)
+            self.null_key_count += null_count
+
+        keys = keys[~nulls]
+        in_chunk = keys.duplicated()
+        seen_before = self.seen_keys.add(key_hashes(key_text(keys[~in_chunk])))
+        self.duplicate_count += int(in_chunk.sum()) + seen_before
+
+    def merge(self, other):
+        """Combine another state built from a disjoint set of rows"""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.columns = list(other.columns)
+            self.date_column = other.date_column
+            self.date_format = other.date_format
+            self.profile = self.profile or other.profile
+            self.null_counts = {col: 0 for col in self.columns}
+
+        # Either side's rows count as missing in the columns only the other side has
+        self._add_columns([col for col in other.columns if col not in self.null_counts],
+                          self.row_count)
+        for col in self.columns:
+            if col not in other.null_counts:
+                self.null_counts[col] += other.row_count
+        for col, rows in other.late_columns.items():
+            self.late_columns[col] = max(self.late_columns.get(col, 0), rows)
+
+        self.row_count += other.row_count
+        for col, count in other.null_counts.items():
+            self.null_counts[col] = self.null_counts.get(col, 0) + count
+
+        overlap = self.seen_keys.update(other.seen_keys)
+        self.duplicate_count += other.duplicate_count + overlap
+        if self.null_key_count and other.null_key_count:
+            self.duplicate_count += 1
+        self.null_key_count += other.null_key_count
+
+        self.date_values += other.date_values
+        self.parsed_dates += other.parsed_dates
+        self.year_counts.update(other.year_counts)
+        self.timeliness_error = self.timeliness_error or other.timeliness_error
+        for result in other.rule_results.values():
+            self._add_rule_result(result)
+        return self
+
+    @property
+    def missing_cells(self):
+        return sum(self.null_counts.values())
+
+    def to_dict(self):
+        """Return a JSON-serializable snapshot of the state
+
+        Seen keys are referenced by their segment files in key_dir, not copied.
+        """
+        return {
+            'key_column': self.key_column,
+            'columns': self.columns,
+            'late_columns': self.late_columns,
+            'date_column': self.date_column,
+            'date_format': self.date_format,
+            'row_count': self.row_count,
+            'null_counts': self.null_counts,
+            'duplicate_count': self.duplicate_count,
+            'key_segments': list(self.seen_keys.segments),
+            'null_key_count': self.null_key_count,
+            'date_values': self.date_values,
+            'parsed_dates': self.parsed_dates,
+            'year_counts': {str(year): count for year, count in self.year_counts.items()},
+            'timeliness_error': self.timeliness_error,
+            'profile': self.profile,
+            'rule_results': list(self.rule_results.values()),
+        }
+
+    @classmethod
+    def from_dict(cls, data, key_dir=None):
+        """Rebuild a state from a to_dict() snapshot whose key segments are in key_dir"""
+        state = cls(data['key_column'], key_dir=key_dir, key_segments=data.get('key_segments', ()))
+        state.columns = data['columns']
+        state.late_columns = dict(data.get('late_columns', {}))
+        state.date_column = data['date_column']
+        state.date_format = data.get('date_format')
+        state.row_count = data['row_count']
+        state.null_counts = dict(data['null_counts'])
+        state.duplicate_count = data['duplicate_count']
+        if data.get('seen_keys'):
+            # Snapshots from before key segments listed the keys themselves
+            state.seen_keys.add(key_hashes(key_text(pd.Series(data['seen_keys']))))
+        state.null_key_count = data['null_key_count']
+        state.date_values = data.get('date_values', data['parsed_dates'])
+        state.parsed_dates = data['parsed_dates']
+        state.year_counts = Counter({int(year): count for year, count in data['year_counts'].items()})
+        state.timeliness_error = data['timeliness_error']
+        state.profile = data.get('profile')
+        state.rule_results = {r['rule']: dict(r) for r in data.get('rule_results', [])}
+        return state
+
+
+class StreamingQualityAnalyzer:
+    """Analyzes dataset quality from an iterator of DataFrame chunks"""
+
+    def __init__(self, chunks, key_column='ApplicationNumber', state=None, duplicates=None,
+                 profile=None, aggregates=None):
+        self.chunks = chunks
+        # A counter from src.duplicates (composite keys, sample keys, or a
+        # HyperLogLog estimate) replaces the state's own key set
+        self.duplicates = duplicates
+        # Optional ChartAggregates filled in the same pass, so charts need no reload
+        self.aggregates = aggregates
+        if state is None:
+            state = QualityState(key_column, track_keys=duplicates is None, profile=profile)
+        self.state = state
+        self.scores = {}
+        self.metrics = {}
+
+    @classmethod
+    def from_csv(cls, filepath, chunksize=100_000, **kwargs):
+        """Build an analyzer that streams a CSV file in chunks"""
+        from src.data_loader import DataLoader
+        return cls(DataLoader().iter_csv(filepath, chunksize=chunksize), **kwargs)
+
+    @profiled
+    def consume(self):
+        """Fold every pending chunk into the running state"""
+        if self.chunks is None:
+            return self.state
+        for chunk in self.chunks:
+            self.state.update(chunk)
+            if self.duplicates is not None and self._has_duplicate_keys(chunk):
+                self.duplicates.add(chunk)
+            if self.aggregates is not None:
+                self.aggregates.update(chunk)
+        self.chunks = None
+        logger.info(f"Streamed {self.state.row_count} records")
+        return self.state
+
+    def _has_duplicate_keys(self, chunk):
+        return all(col in chunk.columns for col in self.duplicates.key_columns)
+
+    @profiled
+    def analyze_all(self):
+        """Run all quality assessments over the streamed chunks"""
+        logger.info("Running streaming quality analysis...")
+        self.consume()
+
+        self.scores['accuracy'] = self.analyze_accuracy()
+        self.scores['completeness'] = self.analyze_completeness()
+        self.scores['timeliness'] = self.analyze_timeliness()
+        self.scores['accessibility'] = self.analyze_accessibility()
+        self.scores['consistency'] = self.analyze_consistency()
+        self.scores['overall'] = np.mean(list(self.scores.values()))
+        if self.aggregates is not None:
+            self.aggregates.set_results(self)
+
+        logger.info(f"Overall quality score: {self.scores['overall']:.2f}/5")
+        return self.scores
+
+    def analyze_accuracy(self):
+        """Assess data accuracy"""
+        score = 5.0
+        issues = []
+
+        dup_rate, error = None, 0.0
+        if self.duplicates is not None:
+            if self.duplicates.rows:
+                result = self.duplicates.result()
+                self.metrics['duplicates'] = result
+                dup_rate = result['duplicate_rate']
+                error = result.get('duplicate_rate_error', 0.0)
+        elif self.state.key_column in (self.state.columns or []) and self.state.row_count:
+            dup_rate = self.state.duplicate_count / self.state.row_count
+
+        if dup_rate is not None:
+            # An estimated rate only counts as high when its lower 95% bound is
+            if dup_rate - DUPLICATE_Z * error > 0.01:
+                score -= 1
+                issues.append(f"High duplicate rate: {dup_rate:.1%}")
+
+        self.metrics['accuracy_issues'] = issues
+        return max(0, min(5, score))
+
+    def analyze_completeness(self):
+        """Assess data completeness"""
+        rows = self.state.row_count
+        total_cells = rows * len(self.state.columns or [])
+        completeness_rate = 1 - (self.state.missing_cells / total_cells) if total_cells else 0.0
+
+        nulls = pd.Series(self.state.null_counts, dtype='float64')
+        field_missing = (nulls / max(rows, 1) * 100).round(2)
+        self.metrics['field_missingness'] = field_missing.to_dict()
+        if self.state.late_columns:
+            self.metrics['late_columns'] = dict(self.state.late_columns)
+
+        self.metrics['overall_completeness'] = completeness_rate
+        return completeness_score(completeness_rate)
+
+    def analyze_timeliness(self):
+        """Assess data timeliness"""
+        if self.state.date_column is None:
+            return 3.0
+        if self.state.timeliness_error is not None:
+            return 2.0
+
+        values = self.state.date_values
+        self.metrics['date_unparseable_rate'] = (
+            (values - self.state.parsed_dates) / values if values else 0.0
+        )
+        if self.state.parsed_dates == 0:
+            return 1.0
+
+        current_year = datetime.now().year
+        recent = sum(count for year, count in self.state.year_counts.items()
+                     if year >= current_year - 2)
+        recent_rate = recent / self.state.parsed_dates
+
+        self.metrics['recent_record_rate'] = recent_rate
+        score = timeliness_score(recent_rate)
+
+        self.metrics['year_distribution'] = {
+            int(year): int(count) for year, count in sorted(self.state.year_counts.items())
+        }
+        return score
+
+    def analyze_accessibility(self):
+        """Assess data accessibility"""
+        score = 5.0
+        if self.state.row_count == 0:
+            return 0
+
+        self.metrics['record_count'] = self.state.row_count
+        self.metrics['field_count'] = len(self.state.columns)
+        return max(1, score)
+
+    def analyze_consistency(self):
+        """Assess data consistency"""
+        score = 5.0
+        self.metrics['dtype_consistency'] = len(self.state.columns or [])
+
+        results = list(self.state.rule_results.values())
+        self.metrics['rule_results'] = results
+        checked = sum(r['checked'] for r in results)
+        if checked:
+            violation_rate = sum(r['violations'] for r in results) / checked
+            self.metrics['rule_violation_rate'] = violation_rate
+            score = consistency_score(violation_rate)
+        return max(1, score)
+
+    def get_summary_report(self):
+        """Generate summary statistics"""
+        return {
+            'total_records': self.state.row_count,
+            'total_fields': len(self.state.columns or []),
+            'missing_cells': self.state.missing_cells,
+            'completeness_rate': self.metrics.get('overall_completeness', 0),
+            'quality_scores': self.scores
+        }
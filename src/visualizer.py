@@ -1,24 +1,99 @@
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
+import io
+import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
+from src.analysis_plan import AnalysisPlan
+from src.profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+
+def _plan(data, plan):
+    """Where a chart reads its counts: an explicit plan, a DataFrame's plan, or aggregates"""
+    if plan is not None:
+        return plan
+    if isinstance(data, pd.DataFrame):
+        return AnalysisPlan(data)
+    # ChartAggregates (or any object with year_counts/value_counts)
+    return data
+
+
+def _render_job(settings, method, args, kwargs):
+    """Draw one chart in a worker process"""
+    viz = QualityVisualizer(headless=True, **settings)
+    return getattr(viz, method)(*args, **kwargs)
+
 
 class QualityVisualizer:
-    """Creates visualizations for data quality reports"""
+    """Creates visualizations for data quality reports
+    
+    With output_dir=None charts are rendered into memory: every plot_* method
+    returns an io.BytesIO holding the encoded image instead of a file path.
     
-    def __init__(self, output_dir='outputs'):
+    The distribution charts take either a DataFrame or precomputed
+    ChartAggregates (src.chart_aggregates), so the raw rows can be freed
+    after analysis and charts redrawn from a saved aggregate file.
+    """
+    
+    def __init__(self, output_dir='outputs', dpi=300, fmt='png', headless=False):
         self.output_dir = output_dir
-        os.makedirs(output_dir, exist_ok=True)
+        self.dpi = dpi
+        self.fmt = fmt
+        if headless:
+            matplotlib.use('Agg', force=True)
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
         plt.style.use('seaborn-v0_8-darkgrid')
         sns.set_palette("husl")
     
-    def plot_temporal_distribution(self, df, date_column, title="Temporal Distribution"):
+    def _save(self, name):
+        """Save and close the current figure"""
+        if self.output_dir is None:
+            buffer = io.BytesIO()
+            plt.savefig(buffer, dpi=self.dpi, bbox_inches='tight', format=self.fmt)
+            plt.close()
+            buffer.seek(0)
+            return buffer
+        filepath = f'{self.output_dir}/{name}.{self.fmt}'
+        plt.savefig(filepath, dpi=self.dpi, bbox_inches='tight', format=self.fmt)
+        plt.close()
+        print(f"✓ Saved {filepath}")
+        return filepath
+    
+    @profiled
+    def render_all(self, jobs, workers=None):
+        """Render plot jobs concurrently in headless worker processes
+        
+        Each job is a (method_name, args) or (method_name, args, kwargs) tuple,
+        e.g. ('plot_quality_radar', (scores,)). Returns the saved file paths in
+        job order, with None for any chart that failed.
+        """
+        settings = {'output_dir': self.output_dir, 'dpi': self.dpi, 'fmt': self.fmt}
+        jobs = [(job[0], tuple(job[1]), dict(job[2]) if len(job) > 2 else {}) for job in jobs]
+        paths = [None] * len(jobs)
+        
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_job, settings, *job) for job in jobs]
+            for i, future in enumerate(futures):
+                try:
+                    paths[i] = future.result()
+                except Exception as e:
+                    logger.error(f"Error rendering {jobs[i][0]}: {e}")
+        return paths
+    
+    @profiled
+    def plot_temporal_distribution(self, df, date_column, title="Temporal Distribution",
+                                   plan=None):
         """Create temporal distribution chart"""
         fig, ax = plt.subplots(figsize=(12, 6))
         
-        dates = pd.to_datetime(df[date_column], errors='coerce').dropna()
-        year_counts = dates.dt.year.value_counts().sort_index()
+        plan = _plan(df, plan)
+        year_counts = plan.year_counts(date_column)
         
         ax.bar(year_counts.index, year_counts.values, color='#8b5cf6', alpha=0.8, edgecolor='black')
         ax.set_xlabel('Year', fontsize=12, fontweight='bold')
@@ -30,12 +105,9 @@ class QualityVisualizer:
                    f'{count:,}', ha='center', va='bottom', fontsize=9)
         
         plt.tight_layout()
-        filepath = f'{self.output_dir}/temporal_distribution.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved {filepath}")
-        return filepath
+        return self._save('temporal_distribution')
     
+    @profiled
     def plot_missingness(self, field_missing_dict, title="Missing Value Rate by Field"):
         """Create missing value chart"""
         sorted_fields = sorted(field_missing_dict.items(), key=lambda x: x[1], reverse=True)
@@ -63,12 +135,9 @@ class QualityVisualizer:
             ax.text(rate + 2, i, f'{rate:.1f}%', va='center', fontsize=10)
         
         plt.tight_layout()
-        filepath = f'{self.output_dir}/missing_values.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved {filepath}")
-        return filepath
+        return self._save('missing_values')
     
+    @profiled
     def plot_quality_radar(self, scores, title="Data Quality Radar Chart"):
         """Create quality radar chart"""
         categories = ['Accuracy', 'Completeness', 'Timeliness', 'Accessibility', 'Consistency']
@@ -99,19 +168,17 @@ class QualityVisualizer:
         ax.grid(True, linestyle='--', alpha=0.7)
         
         plt.tight_layout()
-        filepath = f'{self.output_dir}/quality_radar.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved {filepath}")
-        return filepath
+        return self._save('quality_radar')
     
+    @profiled
     def plot_violations_by_type(self, df, type_column='ViolationType', 
-                                title="Employment Violations by Type"):
+                                title="Employment Violations by Type", plan=None):
         """Create pie chart for violation types"""
         
         fig, ax = plt.subplots(figsize=(10, 8))
         
-        type_counts = df[type_column].value_counts()
+        plan = _plan(df, plan)
+        type_counts = plan.value_counts(type_column)
         colors = ['#ef4444', '#f97316', '#f59e0b', '#eab308', '#84cc16', '#22c55e']
         
         wedges, texts, autotexts = ax.pie(
@@ -126,19 +193,17 @@ class QualityVisualizer:
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         
         plt.tight_layout()
-        filepath = f'{self.output_dir}/violations_by_type.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved {filepath}")
-        return filepath
+        return self._save('violations_by_type')
     
+    @profiled
     def plot_violations_by_year(self, df, year_column='Year',
-                                title="Employment Violations by Year (Ontario)"):
+                                title="Employment Violations by Year (Ontario)", plan=None):
         """Create line chart for yearly trends"""
         
         fig, ax = plt.subplots(figsize=(12, 6))
         
-        yearly_counts = df[year_column].value_counts().sort_index()
+        plan = _plan(df, plan)
+        yearly_counts = plan.value_counts(year_column).sort_index()
         
         ax.plot(yearly_counts.index, yearly_counts.values, 
                 marker='o', linewidth=3, markersize=8,
@@ -155,19 +220,17 @@ class QualityVisualizer:
                    f'{count:,}', ha='center', va='bottom', fontsize=9)
         
         plt.tight_layout()
-        filepath = f'{self.output_dir}/violations_by_year.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved {filepath}")
-        return filepath
+        return self._save('violations_by_year')
     
+    @profiled
     def plot_geographic_distribution(self, df, location_column='City',
-                                     title="Violations by City (Ontario)"):
+                                     title="Violations by City (Ontario)", plan=None):
         """Create bar chart for geographic distribution"""
         
         fig, ax = plt.subplots(figsize=(12, 6))
         
-        location_counts = df[location_column].value_counts().head(10)
+        plan = _plan(df, plan)
+        location_counts = plan.value_counts(location_column).head(10)
         
         bars = ax.bar(range(len(location_counts)), location_counts.values,
                       color='#3b82f6', alpha=0.8, edgecolor='black')
@@ -186,12 +249,9 @@ class QualityVisualizer:
                    f'{count:,}', ha='center', va='bottom', fontsize=10)
         
         plt.tight_layout()
-        filepath = f'{self.output_dir}/geographic_distribution.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved {filepath}")
-        return filepath
+        return self._save('geographic_distribution')
     
+    @profiled
     def plot_ip_composition(self, composition_dict, title="IP Dataset Composition"):
         """Create donut chart for IP composition"""
         
@@ -217,8 +277,4 @@ class QualityVisualizer:
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
         
         plt.tight_layout()
-        filepath = f'{self.output_dir}/ip_composition.png'
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved {filepath}")
-        return filepath
+        return self._save('ip_composition')